@@ -2,7 +2,9 @@ import os
 import logging
 from flask import Flask
 from werkzeug.middleware.proxy_fix import ProxyFix
-from extensions import db
+from flask_migrate import upgrade
+from sqlalchemy.orm import configure_mappers
+from extensions import db, cache, migrate
 
 # Configure logging
 logging.basicConfig(level=logging.DEBUG)
@@ -15,21 +17,48 @@ app.wsgi_app = ProxyFix(app.wsgi_app, x_proto=1, x_host=1)
 # Configure the database
 app.config["SQLALCHEMY_DATABASE_URI"] = os.environ.get("DATABASE_URL", "sqlite:///timetable.db")
 app.config['UPLOAD_FOLDER'] = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'uploads')
+# Larger request bodies are rejected with 413 before they are read
+app.config['MAX_CONTENT_LENGTH'] = int(os.environ.get("MAX_UPLOAD_MB", "16")) * 1024 * 1024
+# CP-SAT search: parallel portfolio workers, and a wall-clock cap on each generation run
+app.config["SOLVER_NUM_WORKERS"] = int(os.environ.get("SOLVER_NUM_WORKERS", os.cpu_count() or 8))
+app.config["SOLVER_TIME_LIMIT_SECONDS"] = float(os.environ.get("SOLVER_TIME_LIMIT_SECONDS", "60"))
+# Day-by-day LNS re-solves after the first timetable is found, within the same time limit; 0 turns it off
+app.config["SOLVER_LNS_ITERATIONS"] = int(os.environ.get("SOLVER_LNS_ITERATIONS", "10"))
+# Workload PDF text extraction: auto (first installed of pymupdf, pypdfium2), pymupdf, pypdfium2 or pypdf2
+app.config["PDF_BACKEND"] = os.environ.get("PDF_BACKEND", "auto").lower()
+# OCR pages that have no text layer (scanned uploads); needs PyMuPDF and Tesseract, and is slow, so off by default
+app.config["PDF_OCR"] = os.environ.get("PDF_OCR", "").lower() in ("1", "true", "yes")
 app.config["SQLALCHEMY_ENGINE_OPTIONS"] = {
     "pool_recycle": 300,
     "pool_pre_ping": True,
 }
 
+# Configure the page cache. Writes invalidate it with cache.clear(), so every worker must share one store:
+# the default directory is shared by all gunicorn workers on a host; use CACHE_TYPE=RedisCache with
+# CACHE_REDIS_URL across hosts. SimpleCache is per process and only safe with a single worker
+app.config["CACHE_TYPE"] = os.environ.get("CACHE_TYPE", "FileSystemCache")
+app.config["CACHE_DIR"] = os.environ.get("CACHE_DIR", os.path.join(app.instance_path, "page_cache"))
+app.config["CACHE_REDIS_URL"] = os.environ.get("CACHE_REDIS_URL")
+app.config["CACHE_KEY_PREFIX"] = "timetable_"
+app.config["CACHE_DEFAULT_TIMEOUT"] = 60
+
 # Initialize the app with the extension
 db.init_app(app)
+cache.init_app(app)
+# SQLite cannot ALTER most column properties, so migrations rebuild its tables in batch mode
+migrate.init_app(app, db, directory=os.path.join(os.path.dirname(os.path.abspath(__file__)), 'migrations'),
+                 render_as_batch=True)
 
 with app.app_context():
     # Import models and routes
     import models
     import routes
+
+    # Resolve every relationship once at boot instead of on the first request
+    configure_mappers()
     
-    # Create all tables
-    db.create_all()
+    # Create the schema on a new database and migrate an existing one (see migrations/)
+    upgrade()
 
 if __name__ == "__main__":
     app.run(debug=True, host="0.0.0.0", port=5000)
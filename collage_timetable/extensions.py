@@ -1,7 +1,38 @@
+import sqlite3
+from flask_caching import Cache
+from flask_migrate import Migrate
 from flask_sqlalchemy import SQLAlchemy
+from flask_sqlalchemy.query import Query
+from sqlalchemy import event
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.engine import Engine
 from sqlalchemy.orm import DeclarativeBase
 
 class Base(DeclarativeBase):
     pass
 
-db = SQLAlchemy(model_class=Base)
+class ActiveQuery(Query):
+    """Query class with a shortcut for the soft-delete filter"""
+
+    def active(self):
+        """Only rows that have not been soft-deleted (matches the partial indexes)"""
+        return self.filter_by(is_active=True)
+
+db = SQLAlchemy(model_class=Base, query_class=ActiveQuery)
+cache = Cache()
+migrate = Migrate()
+
+_DIALECT_INSERTS = {'postgresql': postgresql.insert, 'sqlite': sqlite.insert}
+
+def insert_missing(model, rows, *key):
+    """INSERT ... ON CONFLICT (key) DO NOTHING as one executemany; returns how many rows were new"""
+    insert = _DIALECT_INSERTS[db.engine.dialect.name]
+    return db.session.execute(insert(model.__table__).on_conflict_do_nothing(index_elements=key), rows).rowcount
+
+@event.listens_for(Engine, 'connect')
+def _enable_sqlite_foreign_keys(dbapi_connection, connection_record):
+    """SQLite ignores foreign keys (and so ON DELETE CASCADE) unless asked per connection"""
+    if isinstance(dbapi_connection, sqlite3.Connection):
+        cursor = dbapi_connection.cursor()
+        cursor.execute('PRAGMA foreign_keys=ON')
+        cursor.close()
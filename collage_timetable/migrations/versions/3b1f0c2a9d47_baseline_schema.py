@@ -0,0 +1,178 @@
+"""Baseline schema, as db.create_all() built it before migrations were added
+
+Revision ID: 3b1f0c2a9d47
+Revises:
+Create Date: 2026-10-14 12:30:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3b1f0c2a9d47'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Databases created by db.create_all() before migrations existed already have this schema;
+    # they only need the version table, which Alembic adds once this revision is applied
+    if sa.inspect(op.get_bind()).has_table('teachers'):
+        return
+
+    op.create_table('teachers',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('name', sa.String(length=100), nullable=False),
+        sa.Column('code', sa.String(length=20), nullable=True),
+        sa.Column('designation', sa.String(length=50), nullable=False),
+        sa.Column('max_weekly_load', sa.Integer(), nullable=True),
+        sa.Column('is_active', sa.Boolean(), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('code')
+    )
+    op.create_table('rooms',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('number', sa.String(length=20), nullable=False),
+        sa.Column('name', sa.String(length=100), nullable=True),
+        sa.Column('room_type', sa.String(length=20), nullable=False),
+        sa.Column('capacity', sa.Integer(), nullable=True),
+        sa.Column('is_active', sa.Boolean(), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('number')
+    )
+    op.create_table('courses',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('code', sa.String(length=20), nullable=False),
+        sa.Column('name', sa.String(length=200), nullable=False),
+        sa.Column('credit_hours', sa.Integer(), nullable=True),
+        sa.Column('sessions_per_week', sa.Integer(), nullable=True),
+        sa.Column('session_duration', sa.Integer(), nullable=True),
+        sa.Column('is_lab', sa.Boolean(), nullable=True),
+        sa.Column('is_online', sa.Boolean(), nullable=True),
+        sa.Column('program', sa.String(length=20), nullable=False),
+        sa.Column('semester', sa.String(length=10), nullable=False),
+        sa.Column('is_active', sa.Boolean(), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('code')
+    )
+    op.create_table('sections',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('name', sa.String(length=50), nullable=False),
+        sa.Column('program', sa.String(length=20), nullable=False),
+        sa.Column('semester', sa.String(length=10), nullable=False),
+        sa.Column('section_letter', sa.String(length=5), nullable=True),
+        sa.Column('student_count', sa.Integer(), nullable=True),
+        sa.Column('is_active', sa.Boolean(), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('program', 'semester', 'section_letter')
+    )
+    op.create_table('time_slots',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('day_of_week', sa.Integer(), nullable=False),
+        sa.Column('period_number', sa.Integer(), nullable=False),
+        sa.Column('start_time', sa.String(length=10), nullable=False),
+        sa.Column('end_time', sa.String(length=10), nullable=False),
+        sa.Column('is_break', sa.Boolean(), nullable=True),
+        sa.Column('is_active', sa.Boolean(), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('day_of_week', 'period_number')
+    )
+    op.create_table('timetable_generations',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('status', sa.String(length=20), nullable=True),
+        sa.Column('solver_status', sa.String(length=50), nullable=True),
+        sa.Column('total_slots', sa.Integer(), nullable=True),
+        sa.Column('constraints_satisfied', sa.Integer(), nullable=True),
+        sa.Column('solve_time_seconds', sa.Float(), nullable=True),
+        sa.Column('notes', sa.Text(), nullable=True),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_table('workload_files',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('filename', sa.String(length=255), nullable=False),
+        sa.Column('original_filename', sa.String(length=255), nullable=False),
+        sa.Column('file_path', sa.String(length=500), nullable=False),
+        sa.Column('file_size', sa.Integer(), nullable=True),
+        sa.Column('uploaded_at', sa.DateTime(), nullable=True),
+        sa.Column('processed', sa.Boolean(), nullable=True),
+        sa.Column('processing_status', sa.String(length=50), nullable=True),
+        sa.Column('processing_notes', sa.Text(), nullable=True),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_table('offerings',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('teacher_id', sa.Integer(), nullable=False),
+        sa.Column('course_id', sa.Integer(), nullable=False),
+        sa.Column('section_id', sa.Integer(), nullable=False),
+        sa.Column('room_id', sa.Integer(), nullable=True),
+        sa.ForeignKeyConstraint(['course_id'], ['courses.id']),
+        sa.ForeignKeyConstraint(['room_id'], ['rooms.id']),
+        sa.ForeignKeyConstraint(['section_id'], ['sections.id']),
+        sa.ForeignKeyConstraint(['teacher_id'], ['teachers.id']),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('teacher_id', 'course_id', 'section_id')
+    )
+    op.create_table('teacher_availabilities',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('teacher_id', sa.Integer(), nullable=False),
+        sa.Column('time_slot_id', sa.Integer(), nullable=False),
+        sa.Column('is_available', sa.Boolean(), nullable=True),
+        sa.ForeignKeyConstraint(['teacher_id'], ['teachers.id']),
+        sa.ForeignKeyConstraint(['time_slot_id'], ['time_slots.id']),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('teacher_id', 'time_slot_id')
+    )
+    op.create_table('room_availabilities',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('room_id', sa.Integer(), nullable=False),
+        sa.Column('time_slot_id', sa.Integer(), nullable=False),
+        sa.Column('is_available', sa.Boolean(), nullable=True),
+        sa.ForeignKeyConstraint(['room_id'], ['rooms.id']),
+        sa.ForeignKeyConstraint(['time_slot_id'], ['time_slots.id']),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('room_id', 'time_slot_id')
+    )
+    op.create_table('user_constraints',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('name', sa.String(length=100), nullable=False),
+        sa.Column('constraint_type', sa.String(length=50), nullable=False),
+        sa.Column('teacher_id', sa.Integer(), nullable=True),
+        sa.Column('room_id', sa.Integer(), nullable=True),
+        sa.Column('section_id', sa.Integer(), nullable=True),
+        sa.Column('time_slot_id', sa.Integer(), nullable=True),
+        sa.Column('day_of_week', sa.Integer(), nullable=True),
+        sa.Column('period_number', sa.Integer(), nullable=True),
+        sa.Column('is_active', sa.Boolean(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['room_id'], ['rooms.id']),
+        sa.ForeignKeyConstraint(['section_id'], ['sections.id']),
+        sa.ForeignKeyConstraint(['teacher_id'], ['teachers.id']),
+        sa.ForeignKeyConstraint(['time_slot_id'], ['time_slots.id']),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_table('timetable_slots',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('offering_id', sa.Integer(), nullable=False),
+        sa.Column('section_id', sa.Integer(), nullable=False),
+        sa.Column('room_id', sa.Integer(), nullable=False),
+        sa.Column('time_slot_id', sa.Integer(), nullable=False),
+        sa.Column('is_locked', sa.Boolean(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['offering_id'], ['offerings.id']),
+        sa.ForeignKeyConstraint(['room_id'], ['rooms.id']),
+        sa.ForeignKeyConstraint(['section_id'], ['sections.id']),
+        sa.ForeignKeyConstraint(['time_slot_id'], ['time_slots.id']),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('section_id', 'time_slot_id'),
+        sa.UniqueConstraint('room_id', 'time_slot_id')
+    )
+
+
+def downgrade():
+    for table in ('timetable_slots', 'user_constraints', 'room_availabilities', 'teacher_availabilities',
+                  'offerings', 'workload_files', 'timetable_generations', 'time_slots', 'sections', 'courses',
+                  'rooms', 'teachers'):
+        op.drop_table(table)
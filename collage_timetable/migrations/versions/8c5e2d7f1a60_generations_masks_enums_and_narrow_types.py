@@ -0,0 +1,362 @@
+"""Generations, availability masks, enums and narrower types
+
+Brings a baseline database up to the schema the models declare: slots tagged with their generation and
+carrying teacher/day/period copies, a live-generation flag, availability masks, time slots in minutes,
+enum code columns, small integers and NOT NULL flags, cascading foreign keys, the partial and clash
+indexes, and the section_course_demands, section_day_spans and timetable_view tables.
+
+Revision ID: 8c5e2d7f1a60
+Revises: 3b1f0c2a9d47
+Create Date: 2026-10-14 12:45:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = '8c5e2d7f1a60'
+down_revision = '3b1f0c2a9d47'
+branch_labels = None
+depends_on = None
+
+# Copied from models.py rather than imported, so this revision keeps meaning what it did when written
+PERIODS_PER_DAY = 8
+ALL_SLOTS_MASK = (1 << (7 * PERIODS_PER_DAY)) - 1
+
+ROOM_TYPE = sa.Enum('classroom', 'lab', 'auditorium', name='room_type')
+CONSTRAINT_TYPE = sa.Enum('teacher_unavailable', 'room_unavailable', 'section_preference', 'time_preference',
+                          name='constraint_type')
+GENERATION_STATUS = sa.Enum('pending', 'success', 'failed', name='generation_status')
+PROCESSING_STATUS = sa.Enum('pending', 'processing', 'completed', 'failed', name='processing_status')
+
+ACTIVE = {'postgresql_where': sa.text('is_active'), 'sqlite_where': sa.text('is_active = 1')}
+
+# Names batch mode gives SQLite's unnamed baseline constraints while it reflects a table
+NAMING = {'uq': 'uq_%(table_name)s_%(column_0_N_name)s', 'fk': 'fk_%(table_name)s_%(column_0_name)s'}
+
+
+def _postgres():
+    return op.get_bind().dialect.name == 'postgresql'
+
+
+def _batch(table, **kw):
+    """Plain ALTERs on Postgres; on SQLite, one copy-and-swap of the table for all the changes"""
+    return op.batch_alter_table(table, naming_convention=NAMING, **kw)
+
+
+def _baseline_constraint(table, kind, columns):
+    """Name of an unnamed baseline unique ('uq') or foreign key ('fk') constraint on this backend"""
+    if not _postgres():
+        return f'{kind}_{table}_' + ('_'.join(columns) if kind == 'uq' else columns[0])
+    inspector = sa.inspect(op.get_bind())
+    if kind == 'uq':
+        found = [(c['name'], c['column_names']) for c in inspector.get_unique_constraints(table)]
+    else:
+        found = [(c['name'], c['constrained_columns']) for c in inspector.get_foreign_keys(table)]
+    return next(name for name, constrained in found if constrained == list(columns))
+
+
+def _cascade_foreign_keys(batch_op, table, references):
+    """Recreate the baseline foreign keys of a table with ON DELETE CASCADE, named the way Postgres names them"""
+    for column, target in references.items():
+        batch_op.drop_constraint(_baseline_constraint(table, 'fk', [column]), type_='foreignkey')
+        batch_op.create_foreign_key(f'{table}_{column}_fkey', target, [column], ['id'], ondelete='CASCADE')
+
+
+def _fill_nulls(table, **defaults):
+    """Give NULLs the Python-side default the baseline models inserted, before the column turns NOT NULL"""
+    for column, value in defaults.items():
+        op.execute(sa.text(f'UPDATE {table} SET {column} = :value WHERE {column} IS NULL').bindparams(value=value))
+
+
+def _fill_null_timestamps(table, column):
+    op.execute(f'UPDATE {table} SET {column} = CURRENT_TIMESTAMP WHERE {column} IS NULL')
+
+
+def _to_smallint(batch_op, *columns):
+    for column in columns:
+        batch_op.alter_column(column, existing_type=sa.Integer(), type_=sa.SmallInteger())
+
+
+def _to_enum(batch_op, column, enum, existing_length, nullable):
+    batch_op.alter_column(column, existing_type=sa.String(length=existing_length), type_=enum,
+                          existing_nullable=nullable, postgresql_using=f'{column}::{enum.name}')
+
+
+def _require(batch_op, *flags):
+    for flag in flags:
+        batch_op.alter_column(flag, existing_type=sa.Boolean(), nullable=False)
+
+
+def _timestamp_with_zone(batch_op, column):
+    # The baseline stored naive UTC (datetime.utcnow); the models now take timezone-aware server defaults
+    batch_op.alter_column(column, existing_type=sa.DateTime(), type_=sa.DateTime(timezone=True), nullable=False,
+                          server_default=sa.func.now(), postgresql_using=f"{column} AT TIME ZONE 'UTC'")
+
+
+def _fillfactor(table):
+    # Tables rewritten on every generation keep page headroom on Postgres so updates can stay HOT
+    if _postgres():
+        op.execute(f'ALTER TABLE {table} SET (fillfactor = 80)')
+
+
+def _availability_masks(owner, availability, owner_column):
+    """Clear an owner's mask bit for every slot its availability rows mark unavailable"""
+    bind = op.get_bind()
+    masks = {}
+    for owner_id, day_of_week, period_number in bind.execute(sa.text(
+            f'SELECT a.{owner_column}, t.day_of_week, t.period_number FROM {availability} a '
+            f'JOIN time_slots t ON t.id = a.time_slot_id WHERE NOT a.is_available')):
+        bit = 1 << (day_of_week * PERIODS_PER_DAY + period_number - 1)
+        masks[owner_id] = masks.get(owner_id, ALL_SLOTS_MASK) & ~bit
+    if masks:
+        bind.execute(sa.text(f'UPDATE {owner} SET availability_mask = :mask WHERE id = :id'),
+                     [{'id': owner_id, 'mask': mask} for owner_id, mask in masks.items()])
+
+
+def upgrade():
+    bind = op.get_bind()
+    # db.create_all() on the current models (the shipped database before migrations were added) already
+    # built everything below, down to the last table it adds
+    if sa.inspect(bind).has_table('timetable_view'):
+        return
+
+    if _postgres():
+        for enum in (ROOM_TYPE, CONSTRAINT_TYPE, GENERATION_STATUS, PROCESSING_STATUS):
+            enum.create(bind, checkfirst=True)
+
+    mask_column = {'nullable': False, 'server_default': sa.text(str(ALL_SLOTS_MASK))}
+
+    _fill_nulls('teachers', is_active=True)
+    with _batch('teachers') as batch_op:
+        _to_smallint(batch_op, 'max_weekly_load')
+        _require(batch_op, 'is_active')
+        batch_op.add_column(sa.Column('availability_mask', sa.BigInteger(), **mask_column))
+    op.create_index('ix_teachers_active', 'teachers', ['id'], **ACTIVE)
+
+    _fill_nulls('rooms', is_active=True)
+    with _batch('rooms') as batch_op:
+        _to_enum(batch_op, 'room_type', ROOM_TYPE, 20, nullable=False)
+        _to_smallint(batch_op, 'capacity')
+        _require(batch_op, 'is_active')
+        batch_op.add_column(sa.Column('availability_mask', sa.BigInteger(), **mask_column))
+    op.create_index('ix_rooms_active_type', 'rooms', ['room_type'], **ACTIVE)
+
+    _fill_nulls('courses', is_lab=False, is_online=False, is_active=True)
+    with _batch('courses') as batch_op:
+        _to_smallint(batch_op, 'credit_hours', 'sessions_per_week', 'session_duration')
+        _require(batch_op, 'is_lab', 'is_online', 'is_active')
+    op.create_index('ix_courses_active_prog_sem', 'courses', ['program', 'semester'], **ACTIVE)
+
+    _fill_nulls('sections', is_active=True)
+    with _batch('sections') as batch_op:
+        _to_smallint(batch_op, 'student_count')
+        _require(batch_op, 'is_active')
+    op.create_index('ix_sections_active_prog_sem', 'sections', ['program', 'semester'], **ACTIVE)
+
+    # Time slots move from 'HH:MM' strings to minutes since midnight
+    times = bind.execute(sa.text('SELECT id, start_time, end_time FROM time_slots')).all()
+    if times:
+        minutes = lambda value: str(int(value.split(':')[0]) * 60 + int(value.split(':')[1]))
+        bind.execute(sa.text('UPDATE time_slots SET start_time = :start, end_time = :end WHERE id = :id'),
+                     [{'id': id_, 'start': minutes(start), 'end': minutes(end)} for id_, start, end in times])
+    _fill_nulls('time_slots', is_break=False, is_active=True)
+    with _batch('time_slots') as batch_op:
+        _to_smallint(batch_op, 'day_of_week', 'period_number')
+        for column in ('start_time', 'end_time'):
+            batch_op.alter_column(column, existing_type=sa.String(length=10), type_=sa.SmallInteger(),
+                                  existing_nullable=False, postgresql_using=f'{column}::smallint')
+        _require(batch_op, 'is_break', 'is_active')
+    op.create_index('ix_ts_day_period', 'time_slots', ['day_of_week', 'period_number', 'is_active'])
+
+    _fill_null_timestamps('timetable_generations', 'created_at')
+    with _batch('timetable_generations') as batch_op:
+        _timestamp_with_zone(batch_op, 'created_at')
+        _to_enum(batch_op, 'status', GENERATION_STATUS, 20, nullable=True)
+        _to_smallint(batch_op, 'total_slots', 'constraints_satisfied')
+        batch_op.add_column(sa.Column('is_active', sa.Boolean(), nullable=False, server_default=sa.false()))
+        batch_op.add_column(sa.Column('input_hash', sa.String(length=40), nullable=True))
+    op.create_index('ix_timetable_generations_is_active', 'timetable_generations', ['is_active'])
+    _fillfactor('timetable_generations')
+
+    # Every generation used to replace the one slot table, so its rows belong to the latest successful run;
+    # that run becomes the live one. Slots with no run on record get one made for them
+    live_id = None
+    slot_count = bind.execute(sa.text('SELECT COUNT(*) FROM timetable_slots')).scalar()
+    if slot_count:
+        live_id = bind.execute(sa.text("SELECT MAX(id) FROM timetable_generations WHERE status = 'success'")).scalar()
+        if live_id is None:
+            bind.execute(sa.text(
+                "INSERT INTO timetable_generations (created_at, status, total_slots, notes, is_active) "
+                "VALUES (CURRENT_TIMESTAMP, 'success', :total, 'Timetable from before generations were tracked', "
+                ":live)"
+            ).bindparams(total=slot_count, live=True))
+            live_id = bind.execute(sa.text('SELECT MAX(id) FROM timetable_generations')).scalar()
+        bind.execute(sa.text('UPDATE timetable_generations SET is_active = :live WHERE id = :id')
+                     .bindparams(live=True, id=live_id))
+
+    for column in ('generation_id', 'teacher_id', 'day_of_week', 'period_number'):
+        op.add_column('timetable_slots', sa.Column(column, sa.Integer(), nullable=True))
+    if slot_count:
+        bind.execute(sa.text(
+            'UPDATE timetable_slots SET generation_id = :generation_id, '
+            'teacher_id = (SELECT teacher_id FROM offerings WHERE offerings.id = timetable_slots.offering_id), '
+            'day_of_week = (SELECT day_of_week FROM time_slots WHERE time_slots.id = timetable_slots.time_slot_id), '
+            'period_number = (SELECT period_number FROM time_slots WHERE time_slots.id = timetable_slots.time_slot_id)'
+        ).bindparams(generation_id=live_id))
+    _fill_nulls('timetable_slots', is_locked=False)
+    _fill_null_timestamps('timetable_slots', 'created_at')
+    with _batch('timetable_slots') as batch_op:
+        # Clash keys are now per generation and cover teachers too
+        batch_op.drop_constraint(_baseline_constraint('timetable_slots', 'uq', ['section_id', 'time_slot_id']),
+                                 type_='unique')
+        batch_op.drop_constraint(_baseline_constraint('timetable_slots', 'uq', ['room_id', 'time_slot_id']),
+                                 type_='unique')
+        _cascade_foreign_keys(batch_op, 'timetable_slots', {
+            'offering_id': 'offerings', 'section_id': 'sections', 'room_id': 'rooms', 'time_slot_id': 'time_slots',
+        })
+        batch_op.create_foreign_key('timetable_slots_generation_id_fkey', 'timetable_generations',
+                                    ['generation_id'], ['id'], ondelete='CASCADE')
+        batch_op.create_foreign_key('timetable_slots_teacher_id_fkey', 'teachers', ['teacher_id'], ['id'],
+                                    ondelete='CASCADE')
+        for column in ('generation_id', 'teacher_id'):
+            batch_op.alter_column(column, existing_type=sa.Integer(), nullable=False)
+        for column in ('day_of_week', 'period_number'):
+            batch_op.alter_column(column, existing_type=sa.Integer(), type_=sa.SmallInteger(), nullable=False)
+        _require(batch_op, 'is_locked')
+        _timestamp_with_zone(batch_op, 'created_at')
+        batch_op.create_unique_constraint('timetable_slots_generation_id_teacher_id_time_slot_id_key',
+                                          ['generation_id', 'teacher_id', 'time_slot_id'])
+    op.create_index('ix_timetable_slots_generation_id', 'timetable_slots', ['generation_id'])
+    op.create_index('ix_timetable_slots_offering_id', 'timetable_slots', ['offering_id'])
+    op.create_index('ix_timetable_slots_teacher_id', 'timetable_slots', ['teacher_id'])
+    op.create_index('ix_tslot_section_time', 'timetable_slots', ['generation_id', 'section_id', 'time_slot_id'],
+                    unique=True, postgresql_include=['offering_id'])
+    op.create_index('ix_tslot_room_time', 'timetable_slots', ['generation_id', 'room_id', 'time_slot_id'],
+                    unique=True, postgresql_include=['offering_id'])
+    op.create_index('ix_tslot_section_day_period', 'timetable_slots', ['section_id', 'day_of_week', 'period_number'])
+    _fillfactor('timetable_slots')
+
+    with _batch('offerings') as batch_op:
+        # Named, so the offering routes can tell a duplicate from any other integrity error
+        batch_op.drop_constraint(_baseline_constraint('offerings', 'uq', ['teacher_id', 'course_id', 'section_id']),
+                                 type_='unique')
+        batch_op.create_unique_constraint('uq_offering_tcs', ['teacher_id', 'course_id', 'section_id'])
+    op.create_index('ix_offerings_course_id', 'offerings', ['course_id'])
+    op.create_index('ix_offerings_section_id', 'offerings', ['section_id'])
+
+    # Availability rows are keyed by their natural key, clustered on it on SQLite (WITHOUT ROWID)
+    for table, owner_column, owner, index in (
+            ('teacher_availabilities', 'teacher_id', 'teachers', 'ix_ta_teacher_slot_avail'),
+            ('room_availabilities', 'room_id', 'rooms', 'ix_ra_room_slot_avail')):
+        _fill_nulls(table, is_available=True)
+        with _batch(table, table_kwargs={'sqlite_with_rowid': False}) as batch_op:
+            batch_op.drop_constraint(_baseline_constraint(table, 'uq', [owner_column, 'time_slot_id']),
+                                     type_='unique')
+            _cascade_foreign_keys(batch_op, table, {owner_column: owner, 'time_slot_id': 'time_slots'})
+            batch_op.drop_column('id')
+            batch_op.create_primary_key(f'{table}_pkey', [owner_column, 'time_slot_id'])
+            _require(batch_op, 'is_available')
+        op.create_index(index, table, [owner_column, 'time_slot_id', 'is_available'])
+        _fillfactor(table)
+        _availability_masks(owner, table, owner_column)
+
+    _fill_nulls('user_constraints', is_active=True)
+    _fill_null_timestamps('user_constraints', 'created_at')
+    with _batch('user_constraints') as batch_op:
+        _to_enum(batch_op, 'constraint_type', CONSTRAINT_TYPE, 50, nullable=False)
+        _to_smallint(batch_op, 'day_of_week', 'period_number')
+        _require(batch_op, 'is_active')
+        _timestamp_with_zone(batch_op, 'created_at')
+        _cascade_foreign_keys(batch_op, 'user_constraints', {
+            'teacher_id': 'teachers', 'room_id': 'rooms', 'section_id': 'sections', 'time_slot_id': 'time_slots',
+        })
+    op.create_index('ix_user_constraints_active_type', 'user_constraints', ['constraint_type'], **ACTIVE)
+
+    _fill_nulls('workload_files', processed=False)
+    _fill_null_timestamps('workload_files', 'uploaded_at')
+    with _batch('workload_files') as batch_op:
+        _timestamp_with_zone(batch_op, 'uploaded_at')
+        _require(batch_op, 'processed')
+        _to_enum(batch_op, 'processing_status', PROCESSING_STATUS, 50, nullable=True)
+
+    op.create_table('section_course_demands',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('section_id', sa.Integer(), nullable=False),
+        sa.Column('course_id', sa.Integer(), nullable=False),
+        sa.Column('sessions_remaining', sa.SmallInteger(), nullable=False),
+        sa.Column('eligible_room_ids', sa.JSON(), nullable=False),
+        sa.Column('eligible_teacher_ids', sa.JSON(), nullable=False),
+        sa.ForeignKeyConstraint(['course_id'], ['courses.id']),
+        sa.ForeignKeyConstraint(['section_id'], ['sections.id']),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('section_id', 'course_id')
+    )
+    op.create_index('ix_demand_sess', 'section_course_demands', ['sessions_remaining'])
+
+    op.create_table('section_day_spans',
+        sa.Column('generation_id', sa.Integer(), nullable=False),
+        sa.Column('section_id', sa.Integer(), nullable=False),
+        sa.Column('day_of_week', sa.SmallInteger(), nullable=False),
+        sa.Column('first_period', sa.SmallInteger(), nullable=False),
+        sa.Column('last_period', sa.SmallInteger(), nullable=False),
+        sa.Column('session_count', sa.SmallInteger(), nullable=False),
+        sa.ForeignKeyConstraint(['generation_id'], ['timetable_generations.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['section_id'], ['sections.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('generation_id', 'section_id', 'day_of_week')
+    )
+
+    op.create_table('timetable_view',
+        sa.Column('slot_id', sa.Integer(), autoincrement=False, nullable=False),
+        sa.Column('section_id', sa.Integer(), nullable=False),
+        sa.Column('teacher_id', sa.Integer(), nullable=False),
+        sa.Column('room_id', sa.Integer(), nullable=False),
+        sa.Column('day_of_week', sa.SmallInteger(), nullable=False),
+        sa.Column('period_number', sa.SmallInteger(), nullable=False),
+        sa.Column('start_time', sa.SmallInteger(), nullable=False),
+        sa.Column('end_time', sa.SmallInteger(), nullable=False),
+        sa.Column('section_name', sa.String(length=50), nullable=False),
+        sa.Column('course_code', sa.String(length=20), nullable=False),
+        sa.Column('course_name', sa.String(length=200), nullable=False),
+        sa.Column('is_lab', sa.Boolean(), nullable=False),
+        sa.Column('is_online', sa.Boolean(), nullable=False),
+        sa.Column('teacher_name', sa.String(length=100), nullable=False),
+        sa.Column('room_number', sa.String(length=20), nullable=False),
+        # upgrade() already created the type, so create_table must not try again
+        sa.Column('room_type', postgresql.ENUM(*ROOM_TYPE.enums, name='room_type', create_type=False),
+                  nullable=False),
+        sa.PrimaryKeyConstraint('slot_id')
+    )
+    op.create_index('ix_timetable_view_room_id', 'timetable_view', ['room_id'])
+    op.create_index('ix_timetable_view_teacher_id', 'timetable_view', ['teacher_id'])
+    op.create_index('ix_tview_section_day_period', 'timetable_view', ['section_id', 'day_of_week', 'period_number'])
+
+    # Fill the derived tables from the slots carried over, as SectionDaySpan.rebuild and
+    # TimetableView.refresh would
+    if live_id is not None:
+        bind.execute(sa.text(
+            'INSERT INTO section_day_spans '
+            '(generation_id, section_id, day_of_week, first_period, last_period, session_count) '
+            'SELECT generation_id, section_id, day_of_week, MIN(period_number), MAX(period_number), COUNT(*) '
+            'FROM timetable_slots GROUP BY generation_id, section_id, day_of_week'
+        ))
+        bind.execute(sa.text(
+            'INSERT INTO timetable_view (slot_id, section_id, teacher_id, room_id, day_of_week, period_number, '
+            'start_time, end_time, section_name, course_code, course_name, is_lab, is_online, teacher_name, '
+            'room_number, room_type) '
+            'SELECT s.id, s.section_id, s.teacher_id, s.room_id, s.day_of_week, s.period_number, t.start_time, '
+            't.end_time, sec.name, c.code, c.name, c.is_lab, c.is_online, te.name, r.number, r.room_type '
+            'FROM timetable_slots s '
+            'JOIN offerings o ON o.id = s.offering_id JOIN courses c ON c.id = o.course_id '
+            'JOIN teachers te ON te.id = s.teacher_id JOIN sections sec ON sec.id = s.section_id '
+            'JOIN rooms r ON r.id = s.room_id JOIN time_slots t ON t.id = s.time_slot_id '
+            'WHERE s.generation_id = :generation_id'
+        ).bindparams(generation_id=live_id))
+
+
+def downgrade():
+    # Minutes, masks and generation tags do not map back onto the baseline columns without loss
+    raise NotImplementedError('Downgrading past this revision is not supported; restore a backup taken before '
+                              'upgrading instead')
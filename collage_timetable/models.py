@@ -1,7 +1,53 @@
+import enum
+import hashlib
+from dataclasses import dataclass
 from extensions import db
-from sqlalchemy import ForeignKey, UniqueConstraint
-from sqlalchemy.orm import relationship
-from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy import DDL, ForeignKey, UniqueConstraint, and_, delete, event, func, insert, or_, select, update
+from sqlalchemy.orm import attributes, relationship
+
+# Partial index predicate: only live (not soft-deleted) rows are indexed
+ACTIVE_PG = db.text('is_active')
+ACTIVE_SQLITE = db.text('is_active = 1')
+
+class RoomType(enum.StrEnum):
+    CLASSROOM = 'classroom'
+    LAB = 'lab'
+    AUDITORIUM = 'auditorium'
+
+class ConstraintType(enum.StrEnum):
+    TEACHER_UNAVAILABLE = 'teacher_unavailable'
+    ROOM_UNAVAILABLE = 'room_unavailable'
+    SECTION_PREFERENCE = 'section_preference'
+    TIME_PREFERENCE = 'time_preference'
+
+class GenerationStatus(enum.StrEnum):
+    PENDING = 'pending'
+    SUCCESS = 'success'
+    FAILED = 'failed'
+
+class ProcessingStatus(enum.StrEnum):
+    PENDING = 'pending'
+    PROCESSING = 'processing'
+    COMPLETED = 'completed'
+    FAILED = 'failed'
+
+def _enum_type(enum_class, name):
+    """Native ENUM on Postgres, short VARCHAR elsewhere; stores member values so plain strings still compare equal"""
+    return db.Enum(enum_class, name=name, values_callable=lambda members: [member.value for member in members],
+                   validate_strings=True)
+
+ROOM_TYPE = _enum_type(RoomType, 'room_type')
+
+DAY_NAMES = ('Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday')
+
+# Availability masks pack one bit per (day, period): bit = day * 8 + (period - 1)
+PERIODS_PER_DAY = 8
+ALL_SLOTS_MASK = (1 << (7 * PERIODS_PER_DAY)) - 1
+
+def slot_bit(day_of_week: int, period_number: int) -> int:
+    """Bit for a day/period inside an availability mask"""
+    return 1 << (day_of_week * PERIODS_PER_DAY + period_number - 1)
 
 class Teacher(db.Model):
     """Faculty/Teacher model based on workload data"""
@@ -11,12 +57,19 @@ class Teacher(db.Model):
     name = db.Column(db.String(100), nullable=False)
     code = db.Column(db.String(20), unique=True)  # Optional faculty code
     designation = db.Column(db.String(50), nullable=False)  # Professor, AP Stage-I, etc.
-    max_weekly_load = db.Column(db.Integer, default=16)  # Maximum weekly teaching hours
-    is_active = db.Column(db.Boolean, default=True)
+    max_weekly_load = db.Column(db.SmallInteger, default=16)  # Maximum weekly teaching hours
+    is_active = db.Column(db.Boolean, nullable=False, default=True)
+    # Kept in sync with TeacherAvailability rows; a cleared bit means unavailable
+    availability_mask = db.Column(db.BigInteger, nullable=False, default=ALL_SLOTS_MASK,
+                                  server_default=db.text(str(ALL_SLOTS_MASK)))
 
     # Relationships
-    offerings = relationship("Offering", back_populates="teacher")
-    availabilities = relationship("TeacherAvailability", back_populates="teacher", cascade="all, delete-orphan")
+    offerings = relationship("Offering", back_populates="teacher", lazy="raise_on_sql")
+    availabilities = relationship("TeacherAvailability", back_populates="teacher", cascade="all, delete-orphan",
+                                  lazy="select", passive_deletes=True)
+
+    __table_args__ = (db.Index('ix_teachers_active', 'id',
+                               postgresql_where=ACTIVE_PG, sqlite_where=ACTIVE_SQLITE),)
 
     def __repr__(self):
         return f'<Teacher {self.name}>'
@@ -28,14 +81,21 @@ class Room(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     number = db.Column(db.String(20), nullable=False, unique=True)
     name = db.Column(db.String(100))  # Optional room name
-    room_type = db.Column(db.String(20), nullable=False)  # 'classroom', 'lab', 'auditorium'
-    capacity = db.Column(db.Integer, default=60)
-    is_active = db.Column(db.Boolean, default=True)
+    room_type = db.Column(ROOM_TYPE, nullable=False)
+    capacity = db.Column(db.SmallInteger, default=60)
+    is_active = db.Column(db.Boolean, nullable=False, default=True)
+    # Kept in sync with RoomAvailability rows; a cleared bit means unavailable
+    availability_mask = db.Column(db.BigInteger, nullable=False, default=ALL_SLOTS_MASK,
+                                  server_default=db.text(str(ALL_SLOTS_MASK)))
 
     # Relationships
-    offerings = relationship("Offering", back_populates="room")
-    availabilities = relationship("RoomAvailability", back_populates="room", cascade="all, delete-orphan")
-    timetable_slots = relationship("TimetableSlot", back_populates="room")
+    offerings = relationship("Offering", back_populates="room", lazy="raise_on_sql")
+    availabilities = relationship("RoomAvailability", back_populates="room", cascade="all, delete-orphan",
+                                  lazy="select", passive_deletes=True)
+    timetable_slots = relationship("TimetableSlot", back_populates="room", lazy="raise_on_sql")
+
+    __table_args__ = (db.Index('ix_rooms_active_type', 'room_type',
+                               postgresql_where=ACTIVE_PG, sqlite_where=ACTIVE_SQLITE),)
 
     def __repr__(self):
         return f'<Room {self.number}>'
@@ -47,17 +107,20 @@ class Course(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     code = db.Column(db.String(20), nullable=False, unique=True)  # e.g., BCOM-22-301
     name = db.Column(db.String(200), nullable=False)  # e.g., Company Law
-    credit_hours = db.Column(db.Integer, default=4)
-    sessions_per_week = db.Column(db.Integer, default=4)  # Number of sessions needed per week
-    session_duration = db.Column(db.Integer, default=1)  # Duration in time slots (1 for theory, 2+ for labs)
-    is_lab = db.Column(db.Boolean, default=False)
-    is_online = db.Column(db.Boolean, default=False)
+    credit_hours = db.Column(db.SmallInteger, default=4)
+    sessions_per_week = db.Column(db.SmallInteger, default=4)  # Number of sessions needed per week
+    session_duration = db.Column(db.SmallInteger, default=1)  # Duration in time slots (1 for theory, 2+ for labs)
+    is_lab = db.Column(db.Boolean, nullable=False, default=False)
+    is_online = db.Column(db.Boolean, nullable=False, default=False)
     program = db.Column(db.String(20), nullable=False)  # BCOM, BCA, MCA, MBA, BAHMC
     semester = db.Column(db.String(10), nullable=False)  # I, III, V
-    is_active = db.Column(db.Boolean, default=True)
+    is_active = db.Column(db.Boolean, nullable=False, default=True)
 
     # Relationships
-    offerings = relationship("Offering", back_populates="course")
+    offerings = relationship("Offering", back_populates="course", lazy="raise_on_sql")
+
+    __table_args__ = (db.Index('ix_courses_active_prog_sem', 'program', 'semester',
+                               postgresql_where=ACTIVE_PG, sqlite_where=ACTIVE_SQLITE),)
 
     def __repr__(self):
         return f'<Course {self.code}: {self.name}>'
@@ -71,40 +134,60 @@ class Section(db.Model):
     program = db.Column(db.String(20), nullable=False)  # BCOM, BCA, MCA, MBA, BAHMC
     semester = db.Column(db.String(10), nullable=False)  # I, III, V
     section_letter = db.Column(db.String(5))  # A, B, C, D (optional for single sections)
-    student_count = db.Column(db.Integer, default=60)
-    is_active = db.Column(db.Boolean, default=True)
+    student_count = db.Column(db.SmallInteger, default=60)
+    is_active = db.Column(db.Boolean, nullable=False, default=True)
 
     # Relationships
-    offerings = relationship("Offering", back_populates="section")
-    timetable_slots = relationship("TimetableSlot", back_populates="section")
+    offerings = relationship("Offering", back_populates="section", lazy="raise_on_sql")
+    timetable_slots = relationship("TimetableSlot", back_populates="section", lazy="raise_on_sql")
 
-    __table_args__ = (UniqueConstraint('program', 'semester', 'section_letter'),)
+    __table_args__ = (UniqueConstraint('program', 'semester', 'section_letter'),
+                      db.Index('ix_sections_active_prog_sem', 'program', 'semester',
+                               postgresql_where=ACTIVE_PG, sqlite_where=ACTIVE_SQLITE))
 
     def __repr__(self):
         return f'<Section {self.name}>'
 
+def minutes_to_hhmm(minutes: int) -> str:
+    """Format minutes since midnight as HH:MM"""
+    hours, mins = divmod(minutes, 60)
+    return f'{hours:02d}:{mins:02d}'
+
+def hhmm_to_minutes(value: str) -> int:
+    """Parse an HH:MM string into minutes since midnight"""
+    hours, mins = value.split(':')
+    return int(hours) * 60 + int(mins)
+
 class TimeSlot(db.Model):
     """Time slot model for daily periods"""
     __tablename__ = 'time_slots'
 
     id = db.Column(db.Integer, primary_key=True)
-    day_of_week = db.Column(db.Integer, nullable=False)  # 0=Monday, 6=Sunday
-    period_number = db.Column(db.Integer, nullable=False)  # 1-8 for daily periods
-    start_time = db.Column(db.String(10), nullable=False)  # e.g., "09:00"
-    end_time = db.Column(db.String(10), nullable=False)    # e.g., "09:50"
-    is_break = db.Column(db.Boolean, default=False)
-    is_active = db.Column(db.Boolean, default=True)
+    day_of_week = db.Column(db.SmallInteger, nullable=False)  # 0=Monday, 6=Sunday
+    period_number = db.Column(db.SmallInteger, nullable=False)  # 1-8 for daily periods
+    start_time = db.Column(db.SmallInteger, nullable=False)  # Minutes since midnight, e.g., 540 = 09:00
+    end_time = db.Column(db.SmallInteger, nullable=False)    # e.g., 590 = 09:50
+    is_break = db.Column(db.Boolean, nullable=False, default=False)
+    is_active = db.Column(db.Boolean, nullable=False, default=True)
 
     # Relationships
-    timetable_slots = relationship("TimetableSlot", back_populates="time_slot")
-    teacher_availabilities = relationship("TeacherAvailability", back_populates="time_slot")
-    room_availabilities = relationship("RoomAvailability", back_populates="time_slot")
+    timetable_slots = relationship("TimetableSlot", back_populates="time_slot", lazy="raise_on_sql")
+    teacher_availabilities = relationship("TeacherAvailability", back_populates="time_slot", lazy="raise_on_sql")
+    room_availabilities = relationship("RoomAvailability", back_populates="time_slot", lazy="raise_on_sql")
 
-    __table_args__ = (UniqueConstraint('day_of_week', 'period_number'),)
+    __table_args__ = (UniqueConstraint('day_of_week', 'period_number'),
+                      db.Index('ix_ts_day_period', 'day_of_week', 'period_number', 'is_active'))
+
+    @property
+    def start_label(self) -> str:
+        return minutes_to_hhmm(self.start_time)
+
+    @property
+    def end_label(self) -> str:
+        return minutes_to_hhmm(self.end_time)
 
     def __repr__(self):
-        days = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
-        return f'<TimeSlot {days[self.day_of_week]} Period {self.period_number}>'
+        return f'<TimeSlot {DAY_NAMES[self.day_of_week]} Period {self.period_number} {self.start_label}-{self.end_label}>'
 
 class Offering(db.Model):
     """Junction table linking teachers, courses, and sections"""
@@ -112,113 +195,406 @@ class Offering(db.Model):
 
     id = db.Column(db.Integer, primary_key=True)
     teacher_id = db.Column(db.Integer, ForeignKey('teachers.id'), nullable=False)
-    course_id = db.Column(db.Integer, ForeignKey('courses.id'), nullable=False)
-    section_id = db.Column(db.Integer, ForeignKey('sections.id'), nullable=False)
+    course_id = db.Column(db.Integer, ForeignKey('courses.id'), nullable=False, index=True)
+    section_id = db.Column(db.Integer, ForeignKey('sections.id'), nullable=False, index=True)
     room_id = db.Column(db.Integer, ForeignKey('rooms.id'))  # Preferred room, can be overridden
 
     # Relationships
-    teacher = relationship("Teacher", back_populates="offerings")
-    course = relationship("Course", back_populates="offerings")
-    section = relationship("Section", back_populates="offerings")
-    room = relationship("Room", back_populates="offerings")
-    timetable_slots = relationship("TimetableSlot", back_populates="offering")
+    teacher = relationship("Teacher", back_populates="offerings", lazy="joined", innerjoin=True)
+    course = relationship("Course", back_populates="offerings", lazy="joined", innerjoin=True)
+    section = relationship("Section", back_populates="offerings", lazy="joined", innerjoin=True)
+    room = relationship("Room", back_populates="offerings", lazy="joined")
+    timetable_slots = relationship("TimetableSlot", back_populates="offering", lazy="select",
+                                   cascade="all, delete-orphan")  # ORM deletes, so span listeners fire
 
-    __table_args__ = (UniqueConstraint('teacher_id', 'course_id', 'section_id'),)
+    # Duplicate offerings are rejected here; the add/edit routes rely on it instead of checking first
+    __table_args__ = (UniqueConstraint('teacher_id', 'course_id', 'section_id', name='uq_offering_tcs'),)
 
     def __repr__(self):
-        return f'<Offering {self.teacher.name} - {self.course.code} - {self.section.name}>'
+        # Keys only: a repr must never trigger relationship loads (or trip raiseload)
+        return f'<Offering {self.id} teacher={self.teacher_id} course={self.course_id} section={self.section_id}>'
+
+@dataclass(slots=True, frozen=True)
+class OfferingLite:
+    """Plain projection of an active offering with the course/teacher fields the solvers read"""
+    id: int
+    teacher_id: int
+    course_id: int
+    section_id: int
+    room_id: Optional[int]
+    sessions_per_week: int
+    session_duration: int
+    is_lab: bool
+    teacher_mask: int
+
+    @classmethod
+    def load_active(cls, limit: Optional[int] = None) -> List['OfferingLite']:
+        """Offerings whose course, teacher and section are all active, as one column-only query"""
+        stmt = (
+            select(Offering.id, Offering.teacher_id, Offering.course_id, Offering.section_id, Offering.room_id,
+                   Course.sessions_per_week, Course.session_duration, Course.is_lab, Teacher.availability_mask)
+            .join(Course, Offering.course_id == Course.id)
+            .join(Teacher, Offering.teacher_id == Teacher.id)
+            .join(Section, Offering.section_id == Section.id)
+            .where(Course.is_active == True, Teacher.is_active == True, Section.is_active == True)
+            .limit(limit)
+        )
+        return [cls(*row) for row in db.session.execute(stmt)]
 
 class TimetableSlot(db.Model):
     """Generated timetable slots"""
     __tablename__ = 'timetable_slots'
 
     id = db.Column(db.Integer, primary_key=True)
-    offering_id = db.Column(db.Integer, ForeignKey('offerings.id'), nullable=False)
-    section_id = db.Column(db.Integer, ForeignKey('sections.id'), nullable=False)
-    room_id = db.Column(db.Integer, ForeignKey('rooms.id'), nullable=False)
-    time_slot_id = db.Column(db.Integer, ForeignKey('time_slots.id'), nullable=False)
-    is_locked = db.Column(db.Boolean, default=False)  # For manual constraints
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    # Every slot belongs to the generation run that produced it; only the active run is the live timetable
+    generation_id = db.Column(db.Integer, ForeignKey('timetable_generations.id', ondelete='CASCADE'),
+                              nullable=False, index=True)
+    offering_id = db.Column(db.Integer, ForeignKey('offerings.id', ondelete='CASCADE'), nullable=False,
+                            index=True)  # Offering deletes cascade through here
+    section_id = db.Column(db.Integer, ForeignKey('sections.id', ondelete='CASCADE'), nullable=False)
+    room_id = db.Column(db.Integer, ForeignKey('rooms.id', ondelete='CASCADE'), nullable=False)
+    time_slot_id = db.Column(db.Integer, ForeignKey('time_slots.id', ondelete='CASCADE'), nullable=False)
+    # Denormalized from offering/time_slot so clash checks and exports skip two joins
+    teacher_id = db.Column(db.Integer, ForeignKey('teachers.id', ondelete='CASCADE'), nullable=False, index=True)
+    day_of_week = db.Column(db.SmallInteger, nullable=False)
+    period_number = db.Column(db.SmallInteger, nullable=False)
+    is_locked = db.Column(db.Boolean, nullable=False, default=False)  # For manual constraints
+    created_at = db.Column(db.DateTime(timezone=True), server_default=func.now(), nullable=False)
 
     # Relationships
-    offering = relationship("Offering", back_populates="timetable_slots")
-    section = relationship("Section", back_populates="timetable_slots")
-    room = relationship("Room", back_populates="timetable_slots")
-    time_slot = relationship("TimeSlot", back_populates="timetable_slots")
-
-    __table_args__ = (UniqueConstraint('section_id', 'time_slot_id'),
-                      UniqueConstraint('room_id', 'time_slot_id'))
+    offering = relationship("Offering", back_populates="timetable_slots", lazy="joined", innerjoin=True)
+    section = relationship("Section", back_populates="timetable_slots", lazy="joined", innerjoin=True)
+    room = relationship("Room", back_populates="timetable_slots", lazy="joined", innerjoin=True)
+    time_slot = relationship("TimeSlot", back_populates="timetable_slots", lazy="joined", innerjoin=True)
+
+    # Unique indexes double as the section/room/teacher clash checks within a generation;
+    # on Postgres they also carry offering_id so conflict probes are index-only scans
+    __table_args__ = (db.Index('ix_tslot_section_time', 'generation_id', 'section_id', 'time_slot_id',
+                               unique=True, postgresql_include=['offering_id']),
+                      db.Index('ix_tslot_room_time', 'generation_id', 'room_id', 'time_slot_id',
+                               unique=True, postgresql_include=['offering_id']),
+                      UniqueConstraint('generation_id', 'teacher_id', 'time_slot_id'),
+                      db.Index('ix_tslot_section_day_period', 'section_id', 'day_of_week', 'period_number'))
+
+    @classmethod
+    def current(cls):
+        """Query over the slots of the active generation"""
+        return cls.query.filter(cls.generation_id == TimetableGeneration.active_id())
 
     def __repr__(self):
-        return f'<TimetableSlot {self.offering.course.code} - {self.section.name}>'
+        return (f'<TimetableSlot {self.id} offering={self.offering_id} section={self.section_id} '
+                f'time_slot={self.time_slot_id}>')
+
+class TimetableView(db.Model):
+    """Denormalized copy of the timetable for UI reads, refreshed whenever slots or the rows they copy are written"""
+    __tablename__ = 'timetable_view'
+
+    slot_id = db.Column(db.Integer, primary_key=True, autoincrement=False)  # timetable_slots.id
+    section_id = db.Column(db.Integer, nullable=False)
+    teacher_id = db.Column(db.Integer, nullable=False, index=True)
+    room_id = db.Column(db.Integer, nullable=False, index=True)
+    day_of_week = db.Column(db.SmallInteger, nullable=False)
+    period_number = db.Column(db.SmallInteger, nullable=False)
+    start_time = db.Column(db.SmallInteger, nullable=False)
+    end_time = db.Column(db.SmallInteger, nullable=False)
+    section_name = db.Column(db.String(50), nullable=False)
+    course_code = db.Column(db.String(20), nullable=False)
+    course_name = db.Column(db.String(200), nullable=False)
+    is_lab = db.Column(db.Boolean, nullable=False)
+    is_online = db.Column(db.Boolean, nullable=False)
+    teacher_name = db.Column(db.String(100), nullable=False)
+    room_number = db.Column(db.String(20), nullable=False)
+    room_type = db.Column(ROOM_TYPE, nullable=False)
+
+    __table_args__ = (db.Index('ix_tview_section_day_period', 'section_id', 'day_of_week', 'period_number'),)
+
+    @classmethod
+    def refresh(cls, slot_id: Optional[int] = None):
+        """Rebuild the view rows for one slot, or for the whole active timetable, in the current transaction"""
+        db.session.flush()
+        source = (
+            select(TimetableSlot.id, TimetableSlot.section_id, TimetableSlot.teacher_id, TimetableSlot.room_id,
+                   TimetableSlot.day_of_week, TimetableSlot.period_number, TimeSlot.start_time, TimeSlot.end_time,
+                   Section.name, Course.code, Course.name, Course.is_lab, Course.is_online,
+                   Teacher.name, Room.number, Room.room_type)
+            .join(Offering, TimetableSlot.offering_id == Offering.id)
+            .join(Course, Offering.course_id == Course.id)
+            .join(Teacher, TimetableSlot.teacher_id == Teacher.id)
+            .join(Section, TimetableSlot.section_id == Section.id)
+            .join(Room, TimetableSlot.room_id == Room.id)
+            .join(TimeSlot, TimetableSlot.time_slot_id == TimeSlot.id)
+            .where(TimetableSlot.generation_id == TimetableGeneration.active_id())
+        )
+        clear = delete(cls).execution_options(synchronize_session=False)
+        if slot_id is not None:
+            source = source.where(TimetableSlot.id == slot_id)
+            clear = clear.where(cls.slot_id == slot_id)
+        db.session.execute(clear)
+        db.session.execute(insert(cls).from_select(
+            ['slot_id', 'section_id', 'teacher_id', 'room_id', 'day_of_week', 'period_number',
+             'start_time', 'end_time', 'section_name', 'course_code', 'course_name', 'is_lab', 'is_online',
+             'teacher_name', 'room_number', 'room_type'],
+            source
+        ))
+
+class SectionDaySpan(db.Model):
+    """First and last period a section is on campus each day, per generation"""
+    __tablename__ = 'section_day_spans'
+
+    generation_id = db.Column(db.Integer, ForeignKey('timetable_generations.id', ondelete='CASCADE'),
+                              primary_key=True)
+    section_id = db.Column(db.Integer, ForeignKey('sections.id', ondelete='CASCADE'), primary_key=True)
+    day_of_week = db.Column(db.SmallInteger, primary_key=True)
+    first_period = db.Column(db.SmallInteger, nullable=False)
+    last_period = db.Column(db.SmallInteger, nullable=False)
+    session_count = db.Column(db.SmallInteger, nullable=False)
+
+    @classmethod
+    def rebuild(cls, generation_id: int):
+        """Recompute every span of a generation; bulk slot writes bypass the ORM events below"""
+        _refresh_section_spans(db.session.connection(), generation_id)
+
+    @classmethod
+    def campus_periods(cls, generation_id: int) -> int:
+        """Total periods sections spend on campus across the week, first to last class each day"""
+        return db.session.execute(
+            select(func.coalesce(func.sum(cls.last_period - cls.first_period + 1), 0))
+            .where(cls.generation_id == generation_id)
+        ).scalar()
+
+def _refresh_section_spans(connection, generation_id, section_ids=None):
+    """Replace span rows of a generation (optionally only some sections) from its timetable slots"""
+    source = (
+        select(TimetableSlot.generation_id, TimetableSlot.section_id, TimetableSlot.day_of_week,
+               func.min(TimetableSlot.period_number), func.max(TimetableSlot.period_number), func.count())
+        .where(TimetableSlot.generation_id == generation_id)
+        .group_by(TimetableSlot.generation_id, TimetableSlot.section_id, TimetableSlot.day_of_week)
+    )
+    clear = delete(SectionDaySpan).where(SectionDaySpan.generation_id == generation_id)
+    if section_ids is not None:
+        source = source.where(TimetableSlot.section_id.in_(section_ids))
+        clear = clear.where(SectionDaySpan.section_id.in_(section_ids))
+    connection.execute(clear)
+    connection.execute(insert(SectionDaySpan).from_select(
+        ['generation_id', 'section_id', 'day_of_week', 'first_period', 'last_period', 'session_count'], source
+    ))
+
+@event.listens_for(TimetableSlot, 'after_insert')
+@event.listens_for(TimetableSlot, 'after_update')
+@event.listens_for(TimetableSlot, 'after_delete')
+def _sync_section_spans(mapper, connection, target):
+    # An update can move the slot off another section; refresh that one too
+    section_ids = {target.section_id, *attributes.get_history(target, 'section_id').deleted}
+    _refresh_section_spans(connection, target.generation_id, section_ids)
 
 class TeacherAvailability(db.Model):
     """Teacher availability constraints"""
     __tablename__ = 'teacher_availabilities'
 
-    id = db.Column(db.Integer, primary_key=True)
-    teacher_id = db.Column(db.Integer, ForeignKey('teachers.id'), nullable=False)
-    time_slot_id = db.Column(db.Integer, ForeignKey('time_slots.id'), nullable=False)
-    is_available = db.Column(db.Boolean, default=True)
+    # The natural key is the primary key, so SQLite can store rows clustered on it (WITHOUT ROWID)
+    teacher_id = db.Column(db.Integer, ForeignKey('teachers.id', ondelete='CASCADE'), primary_key=True)
+    time_slot_id = db.Column(db.Integer, ForeignKey('time_slots.id', ondelete='CASCADE'), primary_key=True)
+    is_available = db.Column(db.Boolean, nullable=False, default=True)
 
     # Relationships
-    teacher = relationship("Teacher", back_populates="availabilities")
-    time_slot = relationship("TimeSlot", back_populates="teacher_availabilities")
+    teacher = relationship("Teacher", back_populates="availabilities", lazy="raise_on_sql")
+    time_slot = relationship("TimeSlot", back_populates="teacher_availabilities", lazy="raise_on_sql")
 
-    __table_args__ = (UniqueConstraint('teacher_id', 'time_slot_id'),)
+    __table_args__ = (db.Index('ix_ta_teacher_slot_avail', 'teacher_id', 'time_slot_id', 'is_available'),
+                      {'sqlite_with_rowid': False})
 
 class RoomAvailability(db.Model):
     """Room availability constraints"""
     __tablename__ = 'room_availabilities'
 
-    id = db.Column(db.Integer, primary_key=True)
-    room_id = db.Column(db.Integer, ForeignKey('rooms.id'), nullable=False)
-    time_slot_id = db.Column(db.Integer, ForeignKey('time_slots.id'), nullable=False)
-    is_available = db.Column(db.Boolean, default=True)
+    # The natural key is the primary key, so SQLite can store rows clustered on it (WITHOUT ROWID)
+    room_id = db.Column(db.Integer, ForeignKey('rooms.id', ondelete='CASCADE'), primary_key=True)
+    time_slot_id = db.Column(db.Integer, ForeignKey('time_slots.id', ondelete='CASCADE'), primary_key=True)
+    is_available = db.Column(db.Boolean, nullable=False, default=True)
 
     # Relationships
-    room = relationship("Room", back_populates="availabilities")
-    time_slot = relationship("TimeSlot", back_populates="room_availabilities")
+    room = relationship("Room", back_populates="availabilities", lazy="raise_on_sql")
+    time_slot = relationship("TimeSlot", back_populates="room_availabilities", lazy="raise_on_sql")
+
+    __table_args__ = (db.Index('ix_ra_room_slot_avail', 'room_id', 'time_slot_id', 'is_available'),
+                      {'sqlite_with_rowid': False})
+
+def _refresh_availability_mask(connection, owner, availability, owner_id):
+    """Recompute an owner's availability mask from its unavailable slots"""
+    owner_column = availability.teacher_id if owner is Teacher else availability.room_id
+    unavailable = connection.execute(
+        select(TimeSlot.day_of_week, TimeSlot.period_number)
+        .join(availability, availability.time_slot_id == TimeSlot.id)
+        .where(owner_column == owner_id, availability.is_available == False)
+    )
+    mask = ALL_SLOTS_MASK
+    for day_of_week, period_number in unavailable:
+        mask &= ~slot_bit(day_of_week, period_number)
+    connection.execute(update(owner).where(owner.id == owner_id).values(availability_mask=mask))
+
+@event.listens_for(TeacherAvailability, 'after_insert')
+@event.listens_for(TeacherAvailability, 'after_update')
+@event.listens_for(TeacherAvailability, 'after_delete')
+def _sync_teacher_mask(mapper, connection, target):
+    _refresh_availability_mask(connection, Teacher, TeacherAvailability, target.teacher_id)
+
+@event.listens_for(RoomAvailability, 'after_insert')
+@event.listens_for(RoomAvailability, 'after_update')
+@event.listens_for(RoomAvailability, 'after_delete')
+def _sync_room_mask(mapper, connection, target):
+    _refresh_availability_mask(connection, Room, RoomAvailability, target.room_id)
+
+class SectionCourseDemand(db.Model):
+    """Weekly sessions a section needs of a course, with the rooms and teachers that can serve them"""
+    __tablename__ = 'section_course_demands'
 
-    __table_args__ = (UniqueConstraint('room_id', 'time_slot_id'),)
+    id = db.Column(db.Integer, primary_key=True)
+    section_id = db.Column(db.Integer, ForeignKey('sections.id'), nullable=False)
+    course_id = db.Column(db.Integer, ForeignKey('courses.id'), nullable=False)
+    sessions_remaining = db.Column(db.SmallInteger, nullable=False)
+    # JSON lists rather than ARRAY so the table also works on SQLite
+    eligible_room_ids = db.Column(db.JSON, nullable=False)
+    eligible_teacher_ids = db.Column(db.JSON, nullable=False)
+
+    __table_args__ = (UniqueConstraint('section_id', 'course_id'),
+                      db.Index('ix_demand_sess', 'sessions_remaining'))
+
+    @classmethod
+    def rebuild(cls) -> Dict[Tuple[int, int], 'SectionCourseDemand']:
+        """Recompute demand for all active offerings; returns rows keyed by (section_id, course_id)"""
+        # One query pairs every active offering with the rooms that fit it (type and capacity)
+        rows = db.session.execute(
+            select(Offering.section_id, Offering.course_id, Offering.teacher_id,
+                   Course.sessions_per_week, Room.id)
+            .join(Course, Offering.course_id == Course.id)
+            .join(Section, Offering.section_id == Section.id)
+            .join(Teacher, Offering.teacher_id == Teacher.id)
+            .outerjoin(Room, and_(Room.is_active == True,
+                                  Room.capacity >= Section.student_count,
+                                  or_(Course.is_lab == False, Room.room_type == RoomType.LAB)))
+            .where(Course.is_active == True, Section.is_active == True, Teacher.is_active == True)
+        ).all()
+
+        demands = {}
+        for section_id, course_id, teacher_id, sessions_per_week, room_id in rows:
+            demand = demands.get((section_id, course_id))
+            if demand is None:
+                demand = demands[(section_id, course_id)] = cls(
+                    section_id=section_id, course_id=course_id,
+                    sessions_remaining=sessions_per_week,
+                    eligible_room_ids=[], eligible_teacher_ids=[]
+                )
+            if room_id is not None and room_id not in demand.eligible_room_ids:
+                demand.eligible_room_ids.append(room_id)
+            if teacher_id not in demand.eligible_teacher_ids:
+                demand.eligible_teacher_ids.append(teacher_id)
+
+        db.session.execute(delete(cls))
+        db.session.add_all(demands.values())
+        return demands
 
 class TimetableGeneration(db.Model):
     """Track timetable generation runs"""
     __tablename__ = 'timetable_generations'
 
     id = db.Column(db.Integer, primary_key=True)
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
-    status = db.Column(db.String(20), default='pending')  # pending, success, failed
+    created_at = db.Column(db.DateTime(timezone=True), server_default=func.now(), nullable=False)
+    status = db.Column(_enum_type(GenerationStatus, 'generation_status'), default=GenerationStatus.PENDING)
     solver_status = db.Column(db.String(50))
-    total_slots = db.Column(db.Integer)
-    constraints_satisfied = db.Column(db.Integer)
+    total_slots = db.Column(db.SmallInteger)
+    constraints_satisfied = db.Column(db.SmallInteger)
     solve_time_seconds = db.Column(db.Float)
     notes = db.Column(db.Text)
+    is_active = db.Column(db.Boolean, nullable=False, default=False, server_default=db.false(),
+                          index=True)  # At most one live run
+    input_hash = db.Column(db.String(40))  # input_fingerprint() of the data the run was solved from
+
+    # Successful runs whose slots are kept around so an earlier variation can be swapped back in
+    RETAINED_VARIATIONS = 3
+
+    @classmethod
+    def active_id(cls):
+        """Scalar subquery for the id of the live generation"""
+        return select(cls.id).where(cls.is_active == True).limit(1).scalar_subquery()
+
+    @classmethod
+    def activate(cls, generation_id: int):
+        """Make one generation the live timetable with a single UPDATE; its slots stay where they are"""
+        db.session.execute(update(cls).values(is_active=(cls.id == generation_id)))
+
+    @classmethod
+    def active_or_manual_id(cls) -> int:
+        """Id of the live generation, starting an empty manual one if nothing has been generated yet"""
+        generation_id = db.session.execute(select(cls.id).where(cls.is_active == True)).scalar()
+        if generation_id is None:
+            generation = cls(status=GenerationStatus.SUCCESS, total_slots=0, notes='Manual timetable')
+            db.session.add(generation)
+            db.session.flush()
+            cls.activate(generation.id)
+            generation_id = generation.id
+        return generation_id
+
+    @classmethod
+    def input_fingerprint(cls) -> str:
+        """SHA-1 over every row the solvers read, so a run on unchanged data can be recognised"""
+        digest = hashlib.sha1()
+        for model in (Teacher, Room, Course, Section, TimeSlot, Offering, UserConstraint):
+            table = model.__table__
+            for row in db.session.execute(select(table).order_by(*table.primary_key.columns)):
+                digest.update(repr(tuple(row)).encode())
+            digest.update(b'|')  # Keep table boundaries from running together
+        return digest.hexdigest()
+
+    @classmethod
+    def live_from(cls, input_hash: str) -> Optional['TimetableGeneration']:
+        """The live generation, if it was solved from exactly this input"""
+        return cls.query.filter_by(is_active=True, status=GenerationStatus.SUCCESS, input_hash=input_hash).first()
+
+    @classmethod
+    def prune(cls):
+        """Drop the slots of runs that are neither live nor among the latest retained variations"""
+        kept = (select(cls.id).where(cls.status == GenerationStatus.SUCCESS)
+                .order_by(cls.id.desc()).limit(cls.RETAINED_VARIATIONS))
+        # Pruned generations are never loaded into the session, so skip matching deleted rows against it
+        for model in (SectionDaySpan, TimetableSlot):
+            db.session.execute(delete(model)
+                               .where(model.generation_id.not_in(kept),
+                                      model.generation_id != cls.active_id())
+                               .execution_options(synchronize_session=False))
 
     def __repr__(self):
         return f'<TimetableGeneration {self.id}: {self.status}>'
 
+# Tables rewritten on every generation keep page headroom on Postgres so updates can stay HOT
+for _table in (TimetableSlot.__table__, TeacherAvailability.__table__, RoomAvailability.__table__,
+               TimetableGeneration.__table__):
+    event.listen(_table, 'after_create',
+                 DDL('ALTER TABLE %(table)s SET (fillfactor = 80)').execute_if(dialect='postgresql'))
+
 class UserConstraint(db.Model):
     """User-defined constraints for timetable generation"""
     __tablename__ = 'user_constraints'
 
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(100), nullable=False)
-    constraint_type = db.Column(db.String(50), nullable=False)  # 'teacher_unavailable', 'room_unavailable', 'section_preference', 'time_preference'
-    teacher_id = db.Column(db.Integer, ForeignKey('teachers.id'))
-    room_id = db.Column(db.Integer, ForeignKey('rooms.id'))
-    section_id = db.Column(db.Integer, ForeignKey('sections.id'))
-    time_slot_id = db.Column(db.Integer, ForeignKey('time_slots.id'))
-    day_of_week = db.Column(db.Integer)  # 0-6 for Monday-Sunday
-    period_number = db.Column(db.Integer)  # 1-8 for periods
-    is_active = db.Column(db.Boolean, default=True)
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    constraint_type = db.Column(_enum_type(ConstraintType, 'constraint_type'), nullable=False)
+    teacher_id = db.Column(db.Integer, ForeignKey('teachers.id', ondelete='CASCADE'))
+    room_id = db.Column(db.Integer, ForeignKey('rooms.id', ondelete='CASCADE'))
+    section_id = db.Column(db.Integer, ForeignKey('sections.id', ondelete='CASCADE'))
+    time_slot_id = db.Column(db.Integer, ForeignKey('time_slots.id', ondelete='CASCADE'))
+    day_of_week = db.Column(db.SmallInteger)  # 0-6 for Monday-Sunday
+    period_number = db.Column(db.SmallInteger)  # 1-8 for periods
+    is_active = db.Column(db.Boolean, nullable=False, default=True)
+    created_at = db.Column(db.DateTime(timezone=True), server_default=func.now(), nullable=False)
 
     # Relationships
-    teacher = relationship("Teacher")
-    room = relationship("Room")
-    section = relationship("Section")
-    time_slot = relationship("TimeSlot")
+    teacher = relationship("Teacher", lazy="joined")
+    room = relationship("Room", lazy="joined")
+    section = relationship("Section", lazy="joined")
+    time_slot = relationship("TimeSlot", lazy="raise_on_sql")
+
+    __table_args__ = (db.Index('ix_user_constraints_active_type', 'constraint_type',
+                               postgresql_where=ACTIVE_PG, sqlite_where=ACTIVE_SQLITE),)
 
     def __repr__(self):
         return f'<UserConstraint {self.name}: {self.constraint_type}>'
@@ -231,10 +607,10 @@ class WorkloadFile(db.Model):
     filename = db.Column(db.String(255), nullable=False)
     original_filename = db.Column(db.String(255), nullable=False)
     file_path = db.Column(db.String(500), nullable=False)
-    file_size = db.Column(db.Integer)
-    uploaded_at = db.Column(db.DateTime, default=datetime.utcnow)
-    processed = db.Column(db.Boolean, default=False)
-    processing_status = db.Column(db.String(50), default='pending')  # pending, processing, completed, failed
+    file_size = db.Column(db.Integer)  # Bytes; uploads stay well under 2 GB
+    uploaded_at = db.Column(db.DateTime(timezone=True), server_default=func.now(), nullable=False)
+    processed = db.Column(db.Boolean, nullable=False, default=False)
+    processing_status = db.Column(_enum_type(ProcessingStatus, 'processing_status'), default=ProcessingStatus.PENDING)
     processing_notes = db.Column(db.Text)
 
     def __repr__(self):
@@ -1,14 +1,22 @@
 import os
 import json
 from io import BytesIO, StringIO
-from flask import render_template, request, redirect, url_for, flash, jsonify, send_file, make_response
-from sqlalchemy import func
-from app import app, db
+from flask import (render_template, request, redirect, url_for, flash, jsonify, send_file, Response,
+                   stream_with_context, session, abort)
+from sqlalchemy import func, select, literal, or_, true, union_all, update, delete
+from sqlalchemy.exc import IntegrityError
+from marshmallow import ValidationError
+from sqlalchemy.orm import contains_eager, raiseload
+from app import app, db
+from extensions import cache
 from models import (
-    Teacher, Course, Section, Room, TimeSlot, Offering, TimetableSlot,
-    TeacherAvailability, RoomAvailability, TimetableGeneration, UserConstraint, WorkloadFile
+    Teacher, Course, Section, Room, TimeSlot, Offering, TimetableSlot, TimetableView, SectionDaySpan,
+    TeacherAvailability, RoomAvailability, TimetableGeneration, UserConstraint, WorkloadFile, DAY_NAMES,
+    PERIODS_PER_DAY, GenerationStatus
 )
-from simple_solver import SimpleTimetableSolver
+from schemas import FormSchema, course_schema, room_schema, section_schema, teacher_schema
+from simple_solver import SimpleTimetableSolver
+from workload_processor import enqueue_workload_file
 from reportlab.lib.pagesizes import letter, A4
 from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
@@ -18,20 +26,155 @@ import csv
 from werkzeug.utils import secure_filename
 from datetime import datetime
 
+# Fill relationships from the explicit filter joins rather than a second, aliased set of eager joins
+_OFFERING_JOIN_EAGER = (
+    contains_eager(Offering.teacher),
+    contains_eager(Offering.course),
+    contains_eager(Offering.section),
+)
+_SLOT_JOIN_EAGER = (
+    contains_eager(TimetableSlot.offering).contains_eager(Offering.teacher),
+    contains_eager(TimetableSlot.offering).contains_eager(Offering.course),
+    contains_eager(TimetableSlot.offering).contains_eager(Offering.section),
+    contains_eager(TimetableSlot.offering).raiseload(Offering.room),
+    contains_eager(TimetableSlot.section),
+    contains_eager(TimetableSlot.room),
+    contains_eager(TimetableSlot.time_slot),
+)
+
+# Live-generation slots joined to everything the CSV export and editor read; built once at import so
+# requests only add their filter and reuse the cached compiled SQL
+_CURRENT_SLOTS_STMT = (
+    select(TimetableSlot)
+    .join(Offering, TimetableSlot.offering_id == Offering.id)
+    .join(Course, Offering.course_id == Course.id)
+    .join(Teacher, Offering.teacher_id == Teacher.id)
+    .join(Section, Offering.section_id == Section.id)
+    .join(Room, TimetableSlot.room_id == Room.id)
+    .join(TimeSlot, TimetableSlot.time_slot_id == TimeSlot.id)
+    .where(TimetableSlot.generation_id == TimetableGeneration.active_id())
+    .options(*_SLOT_JOIN_EAGER)
+)
+
+def _filtered_slots_stmt(filter_type, filter_id):
+    """_CURRENT_SLOTS_STMT narrowed to one section, teacher or room"""
+    stmt = _CURRENT_SLOTS_STMT.options(*_lazy_load_guard())
+    if filter_type == 'section' and filter_id:
+        stmt = stmt.where(Section.id == filter_id)
+    elif filter_type == 'teacher' and filter_id:
+        stmt = stmt.where(Teacher.id == filter_id)
+    elif filter_type == 'room' and filter_id:
+        stmt = stmt.where(Room.id == filter_id)
+    return stmt
+
+# Templates label days from the same constant as the exports instead of rebuilding a list per render
+app.jinja_env.globals['DAY_NAMES'] = DAY_NAMES
+
+def _lazy_load_guard():
+    """raiseload('*') under debug/testing so a new lazy load fails loudly; production just degrades"""
+    return (raiseload('*'),) if app.debug or app.testing else ()
+
+# Double bookings are rejected by the unique (generation, section|room|teacher, time slot) keys;
+# the slot routes turn that IntegrityError into this message instead of checking first
+_SLOT_CLASH_ERROR = 'The section, room or teacher already has a class in that time slot'
+_SLOT_CLASH_KEYS = [('generation_id', owner, 'time_slot_id') for owner in ('section_id', 'room_id', 'teacher_id')]
+
+def _key_markers(table, keys):
+    """How each unique key shows up in the driver's message: SQLite names table.column, Postgres' DETAIL lists the key columns"""
+    return tuple(marker for key in keys for marker in (
+        ', '.join(f'{table}.{column}' for column in key),
+        f"Key ({', '.join(key)})",
+    ))
+
+_SLOT_CLASH_MARKERS = _key_markers('timetable_slots', _SLOT_CLASH_KEYS)
+# Postgres also names the constraint itself in the first line
+_DUPLICATE_OFFERING_MARKERS = ('uq_offering_tcs',) + _key_markers('offerings', [('teacher_id', 'course_id', 'section_id')])
+
+def _violates(error: IntegrityError, markers) -> bool:
+    """Whether an IntegrityError came from one of the given keys rather than, say, a foreign key"""
+    message = str(error.orig)
+    return any(marker in message for marker in markers)
+
+def _is_slot_clash(error: IntegrityError) -> bool:
+    """Whether an IntegrityError is a double booking in a time slot"""
+    return _violates(error, _SLOT_CLASH_MARKERS)
+
+def _offering_write_error(error: IntegrityError, duplicate_message: str) -> str:
+    """Roll back a failed offering write; the duplicate message for uq_offering_tcs, else the real error"""
+    db.session.rollback()
+    return duplicate_message if _violates(error, _DUPLICATE_OFFERING_MARKERS) else str(error.orig)
+
+def _slot_write_error(error: IntegrityError):
+    """JSON reply for a failed slot write: the clash message for a double booking, else the real error"""
+    db.session.rollback()
+    return jsonify({'success': False, 'error': _SLOT_CLASH_ERROR if _is_slot_clash(error) else str(error.orig)})
+
+def _count(model, *criteria):
+    """Scalar COUNT(*) subquery over a model"""
+    return select(func.count()).select_from(model).where(*criteria).scalar_subquery()
+
+# Every dashboard counter in one round-trip
+_DASHBOARD_COUNTS_STMT = select(
+    _count(Teacher, Teacher.is_active == True).label('teachers'),
+    _count(Course, Course.is_active == True).label('courses'),
+    _count(Section, Section.is_active == True).label('sections'),
+    _count(Room, Room.is_active == True).label('rooms'),
+    _count(Offering).label('offerings'),
+    _count(TimetableSlot, TimetableSlot.generation_id == TimetableGeneration.active_id()).label('scheduled_slots')
+)
+
+def _has_pending_flashes():
+    """A page carrying flash messages is one-off and must not be served to the next visitor"""
+    return bool(session.get('_flashes'))
+
+@app.after_request
+def _invalidate_cached_pages(response):
+    """Every successful write may change the dashboard counters or the timetable grid"""
+    if request.method not in ('GET', 'HEAD', 'OPTIONS') and response.status_code < 400:
+        cache.clear()
+    return response
+
+@cache.memoize(timeout=600)
+def _filter_options():
+    """Active sections, teachers and rooms as plain rows for the timetable filters; any write clears the cache"""
+    return (
+        db.session.execute(select(Section.id, Section.name).where(Section.is_active == True)).all(),
+        db.session.execute(select(Teacher.id, Teacher.name).where(Teacher.is_active == True)).all(),
+        db.session.execute(select(Room.id, Room.number, Room.name, Room.room_type)
+                           .where(Room.is_active == True)).all(),
+    )
+
+def _soft_delete_or_404(model, row_id):
+    """Clear is_active with one UPDATE ... RETURNING; no returned id means there is no such row"""
+    stmt = update(model).where(model.id == row_id).values(is_active=False).returning(model.id)
+    if db.session.execute(stmt).first() is None:
+        abort(404)
+
+@app.errorhandler(ValidationError)
+def _invalid_form(error):
+    """A form that fails its schema goes back where it came from with the field errors flashed"""
+    flash(f'Invalid input - {FormSchema.error_message(error)}', 'error')
+    if _is_htmx():
+        return _htmx_refresh()
+    return redirect(request.referrer or url_for('index'))
+
+def _is_htmx():
+    """Row edits and deletes on the list pages are posted by htmx, which marks its requests"""
+    return request.headers.get('HX-Request') == 'true'
+
+def _htmx_refresh():
+    """Have htmx reload the whole page, e.g. so a flashed error is shown instead of a swapped row"""
+    return Response(headers={'HX-Refresh': 'true'})
+
 @app.route('/')
+@cache.cached(query_string=True, unless=_has_pending_flashes)
 def index():
     """Dashboard home page"""
-    stats = {
-        'teachers': Teacher.query.filter_by(is_active=True).count(),
-        'courses': Course.query.filter_by(is_active=True).count(),
-        'sections': Section.query.filter_by(is_active=True).count(),
-        'rooms': Room.query.filter_by(is_active=True).count(),
-        'offerings': Offering.query.count(),
-        'scheduled_slots': TimetableSlot.query.count()
-    }
+    stats = dict(db.session.execute(_DASHBOARD_COUNTS_STMT).one()._mapping)
     
     # Get latest generation
-    latest_generation = TimetableGeneration.query.order_by(TimetableGeneration.created_at.desc()).first()
+    latest_generation = TimetableGeneration.query.order_by(TimetableGeneration.created_at.desc(),
+                                                           TimetableGeneration.id.desc()).first()
     
     return render_template('index.html', stats=stats, latest_generation=latest_generation)
 
@@ -39,19 +182,14 @@ def index():
 @app.route('/teachers')
 def teachers():
     """List all teachers"""
-    teachers_list = Teacher.query.filter_by(is_active=True).all()
+    teachers_list = Teacher.query.active().all()
     return render_template('teachers.html', teachers=teachers_list)
 
 @app.route('/teachers/add', methods=['GET', 'POST'])
 def add_teacher():
     """Add new teacher"""
     if request.method == 'POST':
-        teacher = Teacher(
-            name=request.form['name'],
-            code=request.form.get('code'),
-            designation=request.form['designation'],
-            max_weekly_load=int(request.form.get('max_weekly_load', 16))
-        )
+        teacher = Teacher(**teacher_schema.load(request.form))
         db.session.add(teacher)
         db.session.commit()
         flash('Teacher added successfully!', 'success')
@@ -63,20 +201,22 @@ def add_teacher():
 def edit_teacher(teacher_id):
     """Edit teacher"""
     teacher = Teacher.query.get_or_404(teacher_id)
-    teacher.name = request.form['name']
-    teacher.code = request.form.get('code')
-    teacher.designation = request.form['designation']
-    teacher.max_weekly_load = int(request.form.get('max_weekly_load', 16))
+    for field, value in teacher_schema.load(request.form).items():
+        setattr(teacher, field, value)
+    TimetableView.refresh()  # The view copies names and codes, not just ids
     db.session.commit()
+    if _is_htmx():
+        return render_template('_teacher_row.html', teacher=teacher)
     flash('Teacher updated successfully!', 'success')
     return redirect(url_for('teachers'))
 
 @app.route('/teachers/<int:teacher_id>/delete', methods=['POST'])
 def delete_teacher(teacher_id):
     """Delete teacher (soft delete)"""
-    teacher = Teacher.query.get_or_404(teacher_id)
-    teacher.is_active = False
+    _soft_delete_or_404(Teacher, teacher_id)
     db.session.commit()
+    if _is_htmx():
+        return ''  # Swapping in nothing removes the row
     flash('Teacher deleted successfully!', 'success')
     return redirect(url_for('teachers'))
 
@@ -84,24 +224,14 @@ def delete_teacher(teacher_id):
 @app.route('/courses')
 def courses():
     """List all courses"""
-    courses_list = Course.query.filter_by(is_active=True).all()
+    courses_list = Course.query.active().all()
     return render_template('courses.html', courses=courses_list)
 
 @app.route('/courses/add', methods=['GET', 'POST'])
 def add_course():
     """Add new course"""
     if request.method == 'POST':
-        course = Course(
-            code=request.form['code'],
-            name=request.form['name'],
-            credit_hours=int(request.form.get('credit_hours', 4)),
-            sessions_per_week=int(request.form.get('sessions_per_week', 4)),
-            session_duration=int(request.form.get('session_duration', 1)),
-            is_lab=request.form.get('is_lab') == 'on',
-            is_online=request.form.get('is_online') == 'on',
-            program=request.form['program'],
-            semester=request.form['semester']
-        )
+        course = Course(**course_schema.load(request.form))
         db.session.add(course)
         db.session.commit()
         flash('Course added successfully!', 'success')
@@ -113,25 +243,22 @@ def add_course():
 def edit_course(course_id):
     """Edit course"""
     course = Course.query.get_or_404(course_id)
-    course.code = request.form['code']
-    course.name = request.form['name']
-    course.credit_hours = int(request.form.get('credit_hours', 4))
-    course.sessions_per_week = int(request.form.get('sessions_per_week', 4))
-    course.session_duration = int(request.form.get('session_duration', 1))
-    course.is_lab = request.form.get('is_lab') == 'on'
-    course.is_online = request.form.get('is_online') == 'on'
-    course.program = request.form['program']
-    course.semester = request.form['semester']
+    for field, value in course_schema.load(request.form).items():
+        setattr(course, field, value)
+    TimetableView.refresh()  # The view copies names and codes, not just ids
     db.session.commit()
+    if _is_htmx():
+        return render_template('_course_row.html', course=course)
     flash('Course updated successfully!', 'success')
     return redirect(url_for('courses'))
 
 @app.route('/courses/<int:course_id>/delete', methods=['POST'])
 def delete_course(course_id):
     """Delete course (soft delete)"""
-    course = Course.query.get_or_404(course_id)
-    course.is_active = False
+    _soft_delete_or_404(Course, course_id)
     db.session.commit()
+    if _is_htmx():
+        return ''
     flash('Course deleted successfully!', 'success')
     return redirect(url_for('courses'))
 
@@ -139,19 +266,14 @@ def delete_course(course_id):
 @app.route('/rooms')
 def rooms():
     """List all rooms"""
-    rooms_list = Room.query.filter_by(is_active=True).all()
+    rooms_list = Room.query.active().all()
     return render_template('rooms.html', rooms=rooms_list)
 
 @app.route('/rooms/add', methods=['GET', 'POST'])
 def add_room():
     """Add new room"""
     if request.method == 'POST':
-        room = Room(
-            number=request.form['number'],
-            name=request.form.get('name'),
-            room_type=request.form['room_type'],
-            capacity=int(request.form.get('capacity', 60))
-        )
+        room = Room(**room_schema.load(request.form))
         db.session.add(room)
         db.session.commit()
         flash('Room added successfully!', 'success')
@@ -163,20 +285,22 @@ def add_room():
 def edit_room(room_id):
     """Edit room"""
     room = Room.query.get_or_404(room_id)
-    room.number = request.form['number']
-    room.name = request.form.get('name')
-    room.room_type = request.form['room_type']
-    room.capacity = int(request.form.get('capacity', 60))
+    for field, value in room_schema.load(request.form).items():
+        setattr(room, field, value)
+    TimetableView.refresh()  # The view copies names and codes, not just ids
     db.session.commit()
+    if _is_htmx():
+        return render_template('_room_row.html', room=room)
     flash('Room updated successfully!', 'success')
     return redirect(url_for('rooms'))
 
 @app.route('/rooms/<int:room_id>/delete', methods=['POST'])
 def delete_room(room_id):
     """Delete room (soft delete)"""
-    room = Room.query.get_or_404(room_id)
-    room.is_active = False
+    _soft_delete_or_404(Room, room_id)
     db.session.commit()
+    if _is_htmx():
+        return ''
     flash('Room deleted successfully!', 'success')
     return redirect(url_for('rooms'))
 
@@ -184,20 +308,14 @@ def delete_room(room_id):
 @app.route('/sections')
 def sections():
     """List all sections"""
-    sections_list = Section.query.filter_by(is_active=True).all()
+    sections_list = Section.query.active().all()
     return render_template('sections.html', sections=sections_list)
 
 @app.route('/sections/add', methods=['GET', 'POST'])
 def add_section():
     """Add new section"""
     if request.method == 'POST':
-        section = Section(
-            name=request.form['name'],
-            program=request.form['program'],
-            semester=request.form['semester'],
-            section_letter=request.form.get('section_letter'),
-            student_count=int(request.form.get('student_count', 60))
-        )
+        section = Section(**section_schema.load(request.form))
         db.session.add(section)
         db.session.commit()
         flash('Section added successfully!', 'success')
@@ -209,21 +327,22 @@ def add_section():
 def edit_section(section_id):
     """Edit section"""
     section = Section.query.get_or_404(section_id)
-    section.name = request.form['name']
-    section.program = request.form['program']
-    section.semester = request.form['semester']
-    section.section_letter = request.form.get('section_letter')
-    section.student_count = int(request.form.get('student_count', 60))
+    for field, value in section_schema.load(request.form).items():
+        setattr(section, field, value)
+    TimetableView.refresh()  # The view copies names and codes, not just ids
     db.session.commit()
+    if _is_htmx():
+        return render_template('_section_row.html', section=section)
     flash('Section updated successfully!', 'success')
     return redirect(url_for('sections'))
 
 @app.route('/sections/<int:section_id>/delete', methods=['POST'])
 def delete_section(section_id):
     """Delete section (soft delete)"""
-    section = Section.query.get_or_404(section_id)
-    section.is_active = False
+    _soft_delete_or_404(Section, section_id)
     db.session.commit()
+    if _is_htmx():
+        return ''
     flash('Section deleted successfully!', 'success')
     return redirect(url_for('sections'))
 
@@ -231,18 +350,25 @@ def delete_section(section_id):
 @app.route('/generate')
 def generate_page():
     """Timetable generation page"""
-    offerings = Offering.query.join(Teacher).join(Course).join(Section).all()
-    generations = TimetableGeneration.query.order_by(TimetableGeneration.created_at.desc()).limit(10).all()
+    offerings = Offering.query.join(Teacher).join(Course).join(Section).options(*_OFFERING_JOIN_EAGER).all()
+    generations = TimetableGeneration.query.order_by(TimetableGeneration.created_at.desc(),
+                                                    TimetableGeneration.id.desc()).limit(10).all()
     return render_template('generate.html', offerings=offerings, generations=generations)
 
 @app.route('/generate/run', methods=['POST'])
 def run_generation():
     """Run timetable generation"""
     try:
-        solver = SimpleTimetableSolver()
+        solver = SimpleTimetableSolver(num_workers=app.config['SOLVER_NUM_WORKERS'],
+                                       time_limit_seconds=app.config['SOLVER_TIME_LIMIT_SECONDS'],
+                                       lns_iterations=app.config['SOLVER_LNS_ITERATIONS'],
+                                       reuse_unchanged=not request.form.get('new_variation'))
         result = solver.generate_timetable()
         
-        if result['status'] == 'success':
+        if result.get('reused_generation_id'):
+            flash('Nothing has changed since the live timetable was generated, so it was kept. '
+                  'Tick "New variation" to solve again anyway.', 'info')
+        elif result['status'] == 'success':
             flash(f'Timetable generated successfully! {result["total_slots"]} slots scheduled using simplified solver.', 'success')
         else:
             flash(f'Generation failed: {result.get("error", "Unknown error")}', 'error')
@@ -252,32 +378,41 @@ def run_generation():
         flash(f'Generation error: {str(e)}', 'error')
         return redirect(url_for('generate_page'))
 
+@app.route('/generate/<int:generation_id>/activate', methods=['POST'])
+def activate_generation(generation_id):
+    """Swap a retained earlier generation back in as the live timetable"""
+    generation = TimetableGeneration.query.get_or_404(generation_id)
+    has_slots = db.session.execute(
+        select(TimetableSlot.id).where(TimetableSlot.generation_id == generation.id).limit(1)
+    ).first()
+    if generation.status != GenerationStatus.SUCCESS or not has_slots:
+        flash('That generation is no longer available to activate.', 'error')
+    else:
+        TimetableGeneration.activate(generation.id)
+        TimetableView.refresh()
+        db.session.commit()
+        flash('Timetable switched to the selected generation.', 'success')
+    return redirect(url_for('generate_page'))
+
 @app.route('/timetable')
+@cache.cached(query_string=True, unless=_has_pending_flashes)
 def timetable():
     """View generated timetable"""
     filter_type = request.args.get('filter_type', 'section')
     filter_id = request.args.get('filter_id')
     
     # Get filter options
-    sections = Section.query.filter_by(is_active=True).all()
-    teachers = Teacher.query.filter_by(is_active=True).all()
-    rooms = Room.query.filter_by(is_active=True).all()
-    
-    # Get timetable data with explicit join conditions
-    query = (TimetableSlot.query
-             .join(Offering, TimetableSlot.offering_id == Offering.id)
-             .join(Course, Offering.course_id == Course.id)
-             .join(Teacher, Offering.teacher_id == Teacher.id)
-             .join(Section, Offering.section_id == Section.id)
-             .join(Room, TimetableSlot.room_id == Room.id)
-             .join(TimeSlot, TimetableSlot.time_slot_id == TimeSlot.id))
+    sections, teachers, rooms = _filter_options()
+    
+    # Read from the denormalized view: a single-table index scan instead of a six-way join
+    query = TimetableView.query
     
     if filter_type == 'section' and filter_id:
-        query = query.filter(Section.id == filter_id)
+        query = query.filter(TimetableView.section_id == filter_id)
     elif filter_type == 'teacher' and filter_id:
-        query = query.filter(Teacher.id == filter_id)
+        query = query.filter(TimetableView.teacher_id == filter_id)
     elif filter_type == 'room' and filter_id:
-        query = query.filter(Room.id == filter_id)
+        query = query.filter(TimetableView.room_id == filter_id)
     
     timetable_slots = query.all()
     
@@ -289,19 +424,10 @@ def timetable():
     # Organize data for grid display
     grid_data = {}
     for slot in timetable_slots:
-        day = slot.time_slot.day_of_week
-        period = slot.time_slot.period_number
+        if slot.day_of_week not in grid_data:
+            grid_data[slot.day_of_week] = {}
         
-        if day not in grid_data:
-            grid_data[day] = {}
-        
-        grid_data[day][period] = {
-            'course': slot.offering.course,
-            'teacher': slot.offering.teacher,
-            'room': slot.room,
-            'section': slot.section,
-            'slot_id': slot.id
-        }
+        grid_data[slot.day_of_week][slot.period_number] = slot
     
     return render_template('timetable.html', 
                          grid_data=grid_data, 
@@ -324,27 +450,20 @@ def move_timetable_slot():
     try:
         slot = TimetableSlot.query.get_or_404(slot_id)
         
-        # Check for conflicts
-        conflicts = TimetableSlot.query.filter(
-            TimetableSlot.id != slot_id,
-            TimetableSlot.time_slot_id == new_time_slot_id
-        ).filter(
-            (TimetableSlot.section_id == slot.section_id) |
-            (TimetableSlot.room_id == new_room_id) |
-            (TimetableSlot.offering.has(teacher_id=slot.offering.teacher_id))
-        ).first()
-        
-        if conflicts:
-            return jsonify({'success': False, 'error': 'Conflict detected'})
-        
         # Update slot
-        slot.time_slot_id = new_time_slot_id
+        time_slot = TimeSlot.query.get_or_404(new_time_slot_id)
+        slot.time_slot_id = time_slot.id
+        slot.day_of_week = time_slot.day_of_week
+        slot.period_number = time_slot.period_number
         if new_room_id:
             slot.room_id = new_room_id
         
+        TimetableView.refresh(slot.id)
         db.session.commit()
         return jsonify({'success': True})
         
+    except IntegrityError as e:
+        return _slot_write_error(e)
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)})
 
@@ -371,57 +490,36 @@ def export_pdf():
     story.append(Paragraph("College Timetable", title_style))
     story.append(Spacer(1, 12))
     
-    # Get data with explicit join conditions
-    query = (TimetableSlot.query
-             .join(Offering, TimetableSlot.offering_id == Offering.id)
-             .join(Course, Offering.course_id == Course.id)
-             .join(Teacher, Offering.teacher_id == Teacher.id)
-             .join(Section, Offering.section_id == Section.id)
-             .join(Room, TimetableSlot.room_id == Room.id)
-             .join(TimeSlot, TimetableSlot.time_slot_id == TimeSlot.id))
+    # One aggregated row per occupied cell, grouped and ordered by the database
+    cell_text = func.aggregate_strings(
+        TimetableView.course_code + '\n' + TimetableView.teacher_name + '\n' + TimetableView.room_number, '; '
+    )
+    query = (select(TimetableView.period_number, TimetableView.day_of_week, cell_text)
+             .group_by(TimetableView.period_number, TimetableView.day_of_week)
+             .order_by(TimetableView.period_number, TimetableView.day_of_week))
     
     if filter_type == 'section' and filter_id:
-        query = query.filter(Section.id == filter_id)
+        query = query.where(TimetableView.section_id == filter_id)
         section = Section.query.get(filter_id)
         story.append(Paragraph(f"Section: {section.name}", styles['Heading2']))
     elif filter_type == 'teacher' and filter_id:
-        query = query.filter(Teacher.id == filter_id)
+        query = query.where(TimetableView.teacher_id == filter_id)
         teacher = Teacher.query.get(filter_id)
         story.append(Paragraph(f"Teacher: {teacher.name}", styles['Heading2']))
     elif filter_type == 'room' and filter_id:
-        query = query.filter(Room.id == filter_id)
+        query = query.where(TimetableView.room_id == filter_id)
         room = Room.query.get(filter_id)
         story.append(Paragraph(f"Room: {room.number}", styles['Heading2']))
     
     story.append(Spacer(1, 12))
     
-    timetable_slots = query.order_by(TimeSlot.day_of_week, TimeSlot.period_number).all()
-    
-    # Create table data
-    days = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday']
-    periods = list(range(1, 9))  # Periods 1-8
+    cells = {(period, day): text for period, day, text in db.session.execute(query)}
     
-    # Header row
-    table_data = [['Period'] + days]
-    
-    # Build grid
-    grid = {}
-    for slot in timetable_slots:
-        day = slot.time_slot.day_of_week
-        period = slot.time_slot.period_number
-        if period not in grid:
-            grid[period] = {}
-        
-        course_info = f"{slot.offering.course.code}\n{slot.offering.teacher.name}\n{slot.room.number}"
-        grid[period][day] = course_info
-    
-    # Fill table data
-    for period in periods:
-        row = [f"Period {period}"]
-        for day in range(6):  # 0-5 for Mon-Sat
-            cell_data = grid.get(period, {}).get(day, '')
-            row.append(cell_data)
-        table_data.append(row)
+    # Header row, then one row per period (Mon-Sat)
+    days = DAY_NAMES[:6]
+    table_data = [['Period'] + list(days)]
+    for period in range(1, PERIODS_PER_DAY + 1):
+        table_data.append([f"Period {period}"] + [cells.get((period, day), '') for day in range(len(days))])
     
     # Create table
     table = Table(table_data)
@@ -453,63 +551,55 @@ def export_csv():
     filter_type = request.args.get('filter_type', 'section')
     filter_id = request.args.get('filter_id')
     
-    # Get data with explicit join conditions
-    query = (TimetableSlot.query
-             .join(Offering, TimetableSlot.offering_id == Offering.id)
-             .join(Course, Offering.course_id == Course.id)
-             .join(Teacher, Offering.teacher_id == Teacher.id)
-             .join(Section, Offering.section_id == Section.id)
-             .join(Room, TimetableSlot.room_id == Room.id)
-             .join(TimeSlot, TimetableSlot.time_slot_id == TimeSlot.id))
-    
-    if filter_type == 'section' and filter_id:
-        query = query.filter(Section.id == filter_id)
-    elif filter_type == 'teacher' and filter_id:
-        query = query.filter(Teacher.id == filter_id)
-    elif filter_type == 'room' and filter_id:
-        query = query.filter(Room.id == filter_id)
+    stmt = (_filtered_slots_stmt(filter_type, filter_id)
+            .order_by(TimeSlot.day_of_week, TimeSlot.period_number)
+            .execution_options(yield_per=500))
     
-    timetable_slots = query.order_by(TimeSlot.day_of_week, TimeSlot.period_number).all()
-    
-    # Create CSV
-    output = StringIO()
-    writer = csv.writer(output)
-    
-    # Write header
-    writer.writerow(['Day', 'Period', 'Start Time', 'End Time', 'Course Code', 'Course Name', 
-                     'Teacher', 'Section', 'Room', 'Room Type'])
+    def generate():
+        # One small buffer, drained after every batch, so memory stays flat however large the export
+        output = StringIO()
+        writer = csv.writer(output)
+        
+        def drain():
+            line = output.getvalue()
+            output.seek(0)
+            output.truncate()
+            return line
+        
+        # Write header
+        writer.writerow(['Day', 'Period', 'Start Time', 'End Time', 'Course Code', 'Course Name', 
+                         'Teacher', 'Section', 'Room', 'Room Type'])
+        yield drain()
+        
+        # Write data; executed here, inside the streamed context, so each yield_per batch goes out
+        # as one writerows() call and one chunk
+        for batch in db.session.execute(stmt).scalars().partitions():
+            writer.writerows((
+                DAY_NAMES[slot.time_slot.day_of_week],
+                slot.time_slot.period_number,
+                slot.time_slot.start_label,
+                slot.time_slot.end_label,
+                slot.offering.course.code,
+                slot.offering.course.name,
+                slot.offering.teacher.name,
+                slot.section.name,
+                slot.room.number,
+                slot.room.room_type
+            ) for slot in batch)
+            yield drain()
     
-    # Write data
-    days = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
-    for slot in timetable_slots:
-        writer.writerow([
-            days[slot.time_slot.day_of_week],
-            slot.time_slot.period_number,
-            slot.time_slot.start_time,
-            slot.time_slot.end_time,
-            slot.offering.course.code,
-            slot.offering.course.name,
-            slot.offering.teacher.name,
-            slot.section.name,
-            slot.room.number,
-            slot.room.room_type
-        ])
-    
-    output.seek(0)
-    response = make_response(output.getvalue())
-    response.headers['Content-Type'] = 'text/csv'
-    response.headers['Content-Disposition'] = 'attachment; filename=timetable.csv'
-    return response
+    return Response(stream_with_context(generate()), mimetype='text/csv',
+                    headers={'Content-Disposition': 'attachment; filename=timetable.csv'})
 
 # Offerings Management Routes
 @app.route('/offerings')
 def offerings():
     """List all offerings"""
-    offerings_list = Offering.query.join(Teacher).join(Course).join(Section).all()
-    teachers = Teacher.query.filter_by(is_active=True).all()
-    courses = Course.query.filter_by(is_active=True).all()
-    sections = Section.query.filter_by(is_active=True).all()
-    rooms = Room.query.filter_by(is_active=True).all()
+    offerings_list = Offering.query.join(Teacher).join(Course).join(Section).options(*_OFFERING_JOIN_EAGER).all()
+    teachers = Teacher.query.active().all()
+    courses = Course.query.active().all()
+    sections = Section.query.active().all()
+    rooms = Room.query.active().all()
     return render_template('offerings.html', 
                          offerings=offerings_list,
                          teachers=teachers,
@@ -521,17 +611,6 @@ def offerings():
 def add_offering():
     """Add new offering"""
     if request.method == 'POST':
-        # Check if this offering already exists
-        existing = Offering.query.filter_by(
-            teacher_id=request.form['teacher_id'],
-            course_id=request.form['course_id'],
-            section_id=request.form['section_id']
-        ).first()
-        
-        if existing:
-            flash('This offering already exists!', 'error')
-            return redirect(url_for('offerings'))
-        
         offering = Offering(
             teacher_id=request.form['teacher_id'],
             course_id=request.form['course_id'],
@@ -539,7 +618,12 @@ def add_offering():
             room_id=request.form.get('room_id') if request.form.get('room_id') else None
         )
         db.session.add(offering)
-        db.session.commit()
+        try:
+            db.session.commit()
+        except IntegrityError as e:
+            # uq_offering_tcs: the same teacher already teaches this course to this section
+            flash(_offering_write_error(e, 'This offering already exists!'), 'error')
+            return redirect(url_for('offerings'))
         flash('Offering added successfully!', 'success')
         return redirect(url_for('offerings'))
     
@@ -549,39 +633,91 @@ def add_offering():
 def edit_offering(offering_id):
     """Edit offering"""
     offering = Offering.query.get_or_404(offering_id)
+    old_section_id = offering.section_id
     
-    # Check if this combination would create a duplicate
-    existing = Offering.query.filter(
-        Offering.id != offering_id,
-        Offering.teacher_id == request.form['teacher_id'],
-        Offering.course_id == request.form['course_id'],
-        Offering.section_id == request.form['section_id']
-    ).first()
-    
-    if existing:
-        flash('This offering combination already exists!', 'error')
-        return redirect(url_for('offerings'))
-    
-    offering.teacher_id = request.form['teacher_id']
-    offering.course_id = request.form['course_id']
-    offering.section_id = request.form['section_id']
+    offering.teacher_id = int(request.form['teacher_id'])
+    offering.course_id = int(request.form['course_id'])
+    offering.section_id = int(request.form['section_id'])
     offering.room_id = request.form.get('room_id') if request.form.get('room_id') else None
+    try:
+        db.session.flush()
+    except IntegrityError as e:
+        flash(_offering_write_error(e, 'This offering combination already exists!'), 'error')
+        return _htmx_refresh() if _is_htmx() else redirect(url_for('offerings'))
+    
+    # Slots carry their own teacher/section copies for the clash keys; move them with the offering
+    move_slots = (update(TimetableSlot).where(TimetableSlot.offering_id == offering.id)
+                  .values(teacher_id=offering.teacher_id, section_id=offering.section_id)
+                  .returning(TimetableSlot.generation_id)
+                  .execution_options(synchronize_session=False))
+    # Only a clash in the live timetable refuses the edit
+    try:
+        generation_ids = set(db.session.scalars(
+            move_slots.where(TimetableSlot.generation_id == TimetableGeneration.active_id())))
+    except IntegrityError as e:
+        db.session.rollback()
+        if not _is_slot_clash(e):
+            raise
+        flash('That teacher or section already has a class at one of this offering\'s scheduled times!', 'error')
+        return _htmx_refresh() if _is_htmx() else redirect(url_for('offerings'))
+    retained_ids = db.session.scalars(
+        select(TimetableSlot.generation_id).distinct()
+        .where(TimetableSlot.offering_id == offering.id,
+               TimetableSlot.generation_id != TimetableGeneration.active_id())
+    ).all()
+    discarded = 0
+    for generation_id in retained_ids:
+        try:
+            with db.session.begin_nested():
+                generation_ids.update(db.session.scalars(
+                    move_slots.where(TimetableSlot.generation_id == generation_id)))
+        except IntegrityError as e:
+            if not _is_slot_clash(e):
+                raise
+            # A retained variation the edit would double-book can no longer be swapped back in; drop its slots
+            for model in (SectionDaySpan, TimetableSlot):
+                db.session.execute(delete(model).where(model.generation_id == generation_id)
+                                   .execution_options(synchronize_session=False))
+            discarded += 1
+    if discarded:
+        flash(f'{discarded} earlier timetable variation(s) clashed with this change and can no longer be restored.',
+              'warning')
+    if offering.section_id != old_section_id:
+        # The bulk UPDATE skips the slot events that keep section day spans current
+        for generation_id in generation_ids:
+            SectionDaySpan.rebuild(generation_id)
+    TimetableView.refresh()
     db.session.commit()
+    if _is_htmx():
+        return render_template('_offering_row.html', offering=offering)
     flash('Offering updated successfully!', 'success')
     return redirect(url_for('offerings'))
 
+_OFFERING_SCHEDULED_ERROR = 'Cannot delete offering that has scheduled timetable slots!'
+
+def _is_scheduled(offering_id):
+    """Whether the live timetable uses the offering; slots of retained, non-live runs are deleted with it"""
+    return db.session.execute(
+        select(TimetableSlot.id)
+        .where(TimetableSlot.offering_id == offering_id,
+               TimetableSlot.generation_id == TimetableGeneration.active_id())
+        .limit(1)
+    ).first() is not None
+
 @app.route('/offerings/<int:offering_id>/delete', methods=['POST'])
 def delete_offering(offering_id):
     """Delete offering"""
     offering = Offering.query.get_or_404(offering_id)
     
-    # Check if offering has timetable slots
-    if offering.timetable_slots:
-        flash('Cannot delete offering that has scheduled timetable slots!', 'error')
-        return redirect(url_for('offerings'))
+    # Check if the live timetable schedules this offering
+    if _is_scheduled(offering.id):
+        flash(_OFFERING_SCHEDULED_ERROR, 'error')
+        return _htmx_refresh() if _is_htmx() else redirect(url_for('offerings'))
     
     db.session.delete(offering)
     db.session.commit()
+    if _is_htmx():
+        return ''
     flash('Offering deleted successfully!', 'success')
     return redirect(url_for('offerings'))
 
@@ -589,16 +725,20 @@ def delete_offering(offering_id):
 @app.route('/api/offerings')
 def api_offerings():
     """Get offerings for AJAX"""
-    offerings = Offering.query.join(Teacher).join(Course).join(Section).all()
-    data = []
-    for offering in offerings:
-        data.append({
-            'id': offering.id,
-            'teacher': offering.teacher.name,
-            'course': f"{offering.course.code} - {offering.course.name}",
-            'section': offering.section.name,
-            'sessions_per_week': offering.course.sessions_per_week
-        })
+    # Read-only JSON: plain column tuples, no ORM entities to build
+    rows = db.session.execute(
+        select(Offering.id, Teacher.name, Course.code, Course.name, Section.name, Course.sessions_per_week)
+        .join(Teacher, Offering.teacher_id == Teacher.id)
+        .join(Course, Offering.course_id == Course.id)
+        .join(Section, Offering.section_id == Section.id)
+    )
+    data = [{
+        'id': offering_id,
+        'teacher': teacher_name,
+        'course': f"{course_code} - {course_name}",
+        'section': section_name,
+        'sessions_per_week': sessions_per_week
+    } for offering_id, teacher_name, course_code, course_name, section_name, sessions_per_week in rows]
     return jsonify(data)
 
 @app.route('/api/offerings/add', methods=['POST'])
@@ -615,6 +755,8 @@ def api_add_offering():
         db.session.add(offering)
         db.session.commit()
         return jsonify({'success': True, 'id': offering.id})
+    except IntegrityError as e:
+        return jsonify({'success': False, 'error': _offering_write_error(e, 'This offering already exists')})
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)})
 
@@ -623,6 +765,9 @@ def api_delete_offering(offering_id):
     """Delete offering via AJAX"""
     try:
         offering = Offering.query.get_or_404(offering_id)
+        # Same rule as the list page; with no live slots the view holds nothing of this offering
+        if _is_scheduled(offering.id):
+            return jsonify({'success': False, 'error': _OFFERING_SCHEDULED_ERROR})
         db.session.delete(offering)
         db.session.commit()
         return jsonify({'success': True})
@@ -633,10 +778,11 @@ def api_delete_offering(offering_id):
 @app.route('/constraints')
 def constraints():
     """Manage user constraints"""
-    constraints_list = UserConstraint.query.filter_by(is_active=True).order_by(UserConstraint.created_at.desc()).all()
-    teachers = Teacher.query.filter_by(is_active=True).all()
-    rooms = Room.query.filter_by(is_active=True).all()
-    sections = Section.query.filter_by(is_active=True).all()
+    constraints_list = UserConstraint.query.active().order_by(
+        UserConstraint.created_at.desc(), UserConstraint.id.desc()).all()
+    teachers = Teacher.query.active().all()
+    rooms = Room.query.active().all()
+    sections = Section.query.active().all()
     
     return render_template('constraints.html', 
                          constraints=constraints_list,
@@ -669,8 +815,7 @@ def add_constraint():
 def delete_constraint(constraint_id):
     """Delete constraint"""
     try:
-        constraint = UserConstraint.query.get_or_404(constraint_id)
-        constraint.is_active = False
+        _soft_delete_or_404(UserConstraint, constraint_id)
         db.session.commit()
         return jsonify({'success': True})
     except Exception as e:
@@ -680,7 +825,7 @@ def delete_constraint(constraint_id):
 @app.route('/workload')
 def workload_upload():
     """Workload upload page"""
-    workload_files = WorkloadFile.query.order_by(WorkloadFile.uploaded_at.desc()).all()
+    workload_files = WorkloadFile.query.order_by(WorkloadFile.uploaded_at.desc(), WorkloadFile.id.desc()).all()
     return render_template('workload_upload.html', workload_files=workload_files)
 
 @app.route('/workload/upload', methods=['POST'])
@@ -706,25 +851,28 @@ def upload_workload():
             # Ensure upload directory exists
             os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
             
-            file.save(file_path)
+            # Copy the upload to disk in chunks, counting bytes on the way instead of stat-ing afterwards
+            file_size = 0
+            with open(file_path, 'wb') as out:
+                while chunk := file.stream.read(65536):
+                    out.write(chunk)
+                    file_size += len(chunk)
             
             # Create database record
             workload_file = WorkloadFile(
                 filename=unique_filename,
                 original_filename=filename,
                 file_path=file_path,
-                file_size=os.path.getsize(file_path),
+                file_size=file_size,
                 processing_status='pending'
             )
             db.session.add(workload_file)
             db.session.commit()
             
-            # NOTE: This is a synchronous call. For a production environment,
-            # this should be moved to a background worker (e.g., Celery) to avoid blocking the server.
-            from .workload_processor import process_workload_file
-            process_workload_file(workload_file.id)
+            # Parse in the background so the upload returns straight away; the row tracks progress
+            enqueue_workload_file(workload_file.id)
             
-            flash('File uploaded successfully! Processing started.', 'success')
+            flash('File uploaded successfully! Processing started; review the results, then import them.', 'success')
             
     except Exception as e:
         flash(f'Error uploading file: {str(e)}', 'error')
@@ -756,6 +904,24 @@ def workload_results(file_id):
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)})
 
+@app.route('/workload/<int:file_id>/import', methods=['POST'])
+def import_workload_file(file_id):
+    """Add the teachers and courses a processed workload file found, once the user has reviewed them"""
+    try:
+        file = WorkloadFile.query.get_or_404(file_id)
+        
+        if file.processing_status != 'completed':
+            return jsonify({'success': False, 'error': 'File not yet processed'})
+        if file.processed:
+            return jsonify({'success': False, 'error': 'File already imported'})
+        
+        # Parsed again in the background; rows added since the preview are skipped, not duplicated
+        enqueue_workload_file(file.id, save=True)
+        return jsonify({'success': True})
+        
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)})
+
 @app.route('/workload/<int:file_id>/delete', methods=['POST'])
 def delete_workload_file(file_id):
     """Delete workload file"""
@@ -783,50 +949,34 @@ def timetable_edit():
     filter_id = request.args.get('filter_id')
     
     # Get filter options
-    sections = Section.query.filter_by(is_active=True).all()
-    teachers = Teacher.query.filter_by(is_active=True).all()
-    rooms = Room.query.filter_by(is_active=True).all()
-    offerings = Offering.query.join(Course).join(Teacher).join(Section).all()
-    
-    # Get timetable data
-    query = (TimetableSlot.query
-             .join(Offering, TimetableSlot.offering_id == Offering.id)
-             .join(Course, Offering.course_id == Course.id)
-             .join(Teacher, Offering.teacher_id == Teacher.id)
-             .join(Section, Offering.section_id == Section.id)
-             .join(Room, TimetableSlot.room_id == Room.id)
-             .join(TimeSlot, TimetableSlot.time_slot_id == TimeSlot.id))
-    
-    if filter_type == 'section' and filter_id:
-        query = query.filter(Section.id == filter_id)
-    elif filter_type == 'teacher' and filter_id:
-        query = query.filter(Teacher.id == filter_id)
-    elif filter_type == 'room' and filter_id:
-        query = query.filter(Room.id == filter_id)
-    
-    timetable_slots = query.all()
+    sections, teachers, rooms = _filter_options()
+    offerings = Offering.query.join(Course).join(Teacher).join(Section).options(*_OFFERING_JOIN_EAGER).all()
     
     # Get time slots for grid
     time_slots = TimeSlot.query.filter_by(is_active=True, is_break=False).order_by(
         TimeSlot.day_of_week, TimeSlot.period_number
     ).all()
     
-    # Organize data for grid display
+    # Cells come from the denormalized view, like the timetable page: each row already carries every
+    # field a cell shows, so there is no join and no object graph to walk
+    stmt = select(TimetableView).execution_options(yield_per=200)
+    if filter_type == 'section' and filter_id:
+        stmt = stmt.where(TimetableView.section_id == filter_id)
+    elif filter_type == 'teacher' and filter_id:
+        stmt = stmt.where(TimetableView.teacher_id == filter_id)
+    elif filter_type == 'room' and filter_id:
+        stmt = stmt.where(TimetableView.room_id == filter_id)
+    else:
+        # Unfiltered, the grid still has one cell per period; fetch only the slot each cell shows
+        stmt = stmt.where(TimetableView.slot_id.in_(
+            select(func.min(TimetableView.slot_id))
+            .group_by(TimetableView.day_of_week, TimetableView.period_number)
+        ))
+    
+    # Organize data for grid display, streaming the rows in batches rather than buffering them all first
     grid_data = {}
-    for slot in timetable_slots:
-        day = slot.time_slot.day_of_week
-        period = slot.time_slot.period_number
-        
-        if day not in grid_data:
-            grid_data[day] = {}
-        
-        grid_data[day][period] = {
-            'course': slot.offering.course,
-            'teacher': slot.offering.teacher,
-            'room': slot.room,
-            'section': slot.section,
-            'slot_id': slot.id
-        }
+    for slot in db.session.execute(stmt).scalars():
+        grid_data.setdefault(slot.day_of_week, {})[slot.period_number] = slot
     
     return render_template('timetable_edit.html', 
                          grid_data=grid_data, 
@@ -841,33 +991,49 @@ def timetable_edit():
 @app.route('/timetable/slot/<int:slot_id>')
 def get_slot(slot_id):
     """Get slot details for editing"""
-    try:
-        slot = TimetableSlot.query.get_or_404(slot_id)
-        return jsonify({
-            'success': True,
-            'slot': {
-                'id': slot.id,
-                'offering_id': slot.offering_id,
-                'room_id': slot.room_id,
-                'time_slot_id': slot.time_slot_id
-            }
-        })
-    except Exception as e:
-        return jsonify({'success': False, 'error': str(e)})
+    # The modal needs only these ids, so fetch them as a row rather than building a slot instance
+    slot = db.session.execute(
+        select(TimetableSlot.id, TimetableSlot.offering_id, TimetableSlot.room_id, TimetableSlot.time_slot_id)
+        .where(TimetableSlot.id == slot_id)
+    ).first()
+    if slot is None:
+        return jsonify({'success': False, 'error': 'Slot not found'}), 404
+    return jsonify({'success': True, 'slot': slot._asdict()})
+
+def _slot_placement(offering_id, time_slot_id):
+    """Section/teacher of an offering, day/period of a time slot and the live generation id, in one round-trip"""
+    return db.session.execute(
+        select(Offering.section_id, Offering.teacher_id, TimeSlot.day_of_week, TimeSlot.period_number,
+               TimetableGeneration.active_id().label('generation_id'))
+        .join(TimeSlot, true())  # Two independent primary-key lookups, one row each
+        .where(Offering.id == offering_id, TimeSlot.id == time_slot_id)
+    ).one()
 
 @app.route('/timetable/slot/add', methods=['POST'])
 def add_slot():
     """Add new timetable slot"""
     try:
+        offering_id = int(request.form['offering_id'])
+        time_slot_id = int(request.form['time_slot_id'])
+        placement = _slot_placement(offering_id, time_slot_id)
         slot = TimetableSlot(
-            offering_id=int(request.form['offering_id']),
-            section_id=Offering.query.get(int(request.form['offering_id'])).section_id,
+            # Only the very first manual slot needs a generation started for it
+            generation_id=placement.generation_id or TimetableGeneration.active_or_manual_id(),
+            offering_id=offering_id,
+            section_id=placement.section_id,
+            teacher_id=placement.teacher_id,
             room_id=int(request.form['room_id']),
-            time_slot_id=int(request.form['time_slot_id'])
+            time_slot_id=time_slot_id,
+            day_of_week=placement.day_of_week,
+            period_number=placement.period_number
         )
         db.session.add(slot)
+        db.session.flush()
+        TimetableView.refresh(slot.id)
         db.session.commit()
         return jsonify({'success': True})
+    except IntegrityError as e:
+        return _slot_write_error(e)
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)})
 
@@ -876,12 +1042,23 @@ def update_slot(slot_id):
     """Update timetable slot"""
     try:
         slot = TimetableSlot.query.get_or_404(slot_id)
-        slot.offering_id = int(request.form['offering_id'])
-        slot.section_id = Offering.query.get(int(request.form['offering_id'])).section_id
+        offering_id = int(request.form['offering_id'])
+        time_slot_id = int(request.form['time_slot_id'])
+        # Look the placement up before touching the slot: the query autoflushes, and a
+        # half-updated row (new time, old section) would be rejected as a clash
+        placement = _slot_placement(offering_id, time_slot_id)
+        slot.offering_id = offering_id
+        slot.time_slot_id = time_slot_id
+        slot.section_id = placement.section_id
+        slot.teacher_id = placement.teacher_id
         slot.room_id = int(request.form['room_id'])
-        slot.time_slot_id = int(request.form['time_slot_id'])
+        slot.day_of_week = placement.day_of_week
+        slot.period_number = placement.period_number
+        TimetableView.refresh(slot.id)
         db.session.commit()
         return jsonify({'success': True})
+    except IntegrityError as e:
+        return _slot_write_error(e)
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)})
 
@@ -891,63 +1068,61 @@ def delete_slot(slot_id):
     try:
         slot = TimetableSlot.query.get_or_404(slot_id)
         db.session.delete(slot)
+        TimetableView.refresh(slot_id)
         db.session.commit()
         return jsonify({'success': True})
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)})
 
+def _clash_groups(kind, owner, owner_id, label):
+    """(kind, label, day, period) of every owner booked more than once into the same live time slot"""
+    return (
+        select(literal(kind).label('kind'), label.label('label'),
+               TimetableSlot.day_of_week, TimetableSlot.period_number)
+        .select_from(TimetableSlot)
+        .join(owner, owner_id == owner.id)
+        .where(TimetableSlot.generation_id == TimetableGeneration.active_id())
+        .group_by(owner_id, label, TimetableSlot.time_slot_id, TimetableSlot.day_of_week,
+                  TimetableSlot.period_number)
+        .having(func.count() > 1)
+    )
+
+# All three clash checks as one round-trip; the kind column says which check a row came from
+_CONFLICTS_STMT = union_all(
+    _clash_groups('teacher_conflict', Teacher, TimetableSlot.teacher_id, Teacher.name),
+    _clash_groups('room_conflict', Room, TimetableSlot.room_id, Room.number),
+    _clash_groups('section_conflict', Section, TimetableSlot.section_id, Section.name),
+)
+_CONFLICT_NOUNS = {'teacher_conflict': 'Teacher', 'room_conflict': 'Room', 'section_conflict': 'Section'}
+
+# The same checks as a yes/no: each EXISTS stops at its first clashing group instead of listing them all
+_ANY_CONFLICT_STMT = select(or_(*(check.exists() for check in _CONFLICTS_STMT.selects)))
+
+@app.route('/timetable/has-conflicts')
+@cache.cached(key_prefix='has_conflicts')
+def has_conflicts():
+    """Whether the live timetable has any clash at all, for the editor's badge"""
+    return jsonify({'any': db.session.execute(_ANY_CONFLICT_STMT).scalar()})
+
 @app.route('/timetable/check-conflicts')
+@cache.cached(key_prefix='conflicts', response_filter=lambda response: response.get_json().get('success'))
 def check_conflicts():
     """Check for timetable conflicts"""
     try:
         conflicts = []
         
-        # Check for teacher conflicts
-        teacher_conflicts = db.session.query(TimetableSlot).join(Offering).join(TimeSlot).group_by(
-            Offering.teacher_id, TimeSlot.day_of_week, TimeSlot.period_number
-        ).having(func.count(TimetableSlot.id) > 1).all()
-        
-        for conflict in teacher_conflicts:
+        # Grouped in SQL on the denormalized slot columns, so only clashing groups come back, as plain tuples
+        for kind, name, day, period in db.session.execute(_CONFLICTS_STMT):
             conflicts.append({
-                'type': 'teacher_conflict',
-                'message': f'Teacher {conflict.offering.teacher.name} has multiple classes at the same time'
+                'type': kind,
+                'message': f'{_CONFLICT_NOUNS[kind]} {name} has multiple classes at the same time '
+                           f'({DAY_NAMES[day]} period {period})'
             })
         
-        # Check for room conflicts
-        room_conflicts = db.session.query(TimetableSlot).join(Room).join(TimeSlot).group_by(
-            TimetableSlot.room_id, TimeSlot.day_of_week, TimeSlot.period_number
-        ).having(func.count(TimetableSlot.id) > 1).all()
-        
-        for conflict in room_conflicts:
-            conflicts.append({
-                'type': 'room_conflict',
-                'message': f'Room {conflict.room.number} has multiple classes at the same time'
-            })
-        
-        # Check for section conflicts
-        section_conflicts = db.session.query(TimetableSlot).join(Section).join(TimeSlot).group_by(
-            TimetableSlot.section_id, TimeSlot.day_of_week, TimeSlot.period_number
-        ).having(func.count(TimetableSlot.id) > 1).all()
-        
-        for conflict in section_conflicts:
-            conflicts.append({
-                'type': 'section_conflict',
-                'message': f'Section {conflict.section.name} has multiple classes at the same time'
-            })
-        
-        # Generate HTML for conflicts
-        if conflicts:
-            html = '<ul class="list-unstyled">'
-            for conflict in conflicts:
-                html += f'<li><i class="text-danger me-2">⚠</i>{conflict["message"]}</li>'
-            html += '</ul>'
-        else:
-            html = '<p class="text-success">No conflicts detected!</p>'
-        
         return jsonify({
             'success': True,
             'conflicts': conflicts,
-            'html': html
+            'html': render_template('_conflicts.html', conflicts=conflicts)
         })
         
     except Exception as e:
@@ -0,0 +1,49 @@
+from marshmallow import EXCLUDE, Schema, ValidationError, fields, validate
+from models import RoomType
+
+class FormSchema(Schema):
+    """Base for HTML form payloads: extra form fields are ignored, not rejected"""
+
+    class Meta:
+        unknown = EXCLUDE
+
+    @staticmethod
+    def error_message(error: ValidationError) -> str:
+        """Flatten field errors into one flash-able line"""
+        return '; '.join(f"{field}: {' '.join(messages)}" for field, messages in error.messages.items())
+
+class TeacherSchema(FormSchema):
+    name = fields.Str(required=True)
+    code = fields.Str(load_default=None)
+    designation = fields.Str(required=True)
+    max_weekly_load = fields.Int(load_default=16, validate=validate.Range(min=0))
+
+class CourseSchema(FormSchema):
+    code = fields.Str(required=True)
+    name = fields.Str(required=True)
+    credit_hours = fields.Int(load_default=4, validate=validate.Range(min=0))
+    sessions_per_week = fields.Int(load_default=4, validate=validate.Range(min=0))
+    session_duration = fields.Int(load_default=1, validate=validate.Range(min=1))
+    is_lab = fields.Bool(load_default=False)  # Checkboxes post 'on' or nothing
+    is_online = fields.Bool(load_default=False)
+    program = fields.Str(required=True)
+    semester = fields.Str(required=True)
+
+class RoomSchema(FormSchema):
+    number = fields.Str(required=True)
+    name = fields.Str(load_default=None)
+    room_type = fields.Str(required=True, validate=validate.OneOf([t.value for t in RoomType]))
+    capacity = fields.Int(load_default=60, validate=validate.Range(min=0))
+
+class SectionSchema(FormSchema):
+    name = fields.Str(required=True)
+    program = fields.Str(required=True)
+    semester = fields.Str(required=True)
+    section_letter = fields.Str(load_default=None)
+    student_count = fields.Int(load_default=60, validate=validate.Range(min=0))
+
+# Stateless, so one instance per form is shared by every request
+teacher_schema = TeacherSchema()
+course_schema = CourseSchema()
+room_schema = RoomSchema()
+section_schema = SectionSchema()
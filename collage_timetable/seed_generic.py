@@ -8,9 +8,11 @@ import sys
 import os
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
-from app import app, db
+from sqlalchemy import select
+from app import app, db
+from extensions import insert_missing
 # Import models after app is initialized
-from models import Teacher, Course, Section, Room, TimeSlot, Offering, TimetableSlot
+from models import Teacher, Course, Section, Room, TimeSlot, Offering, hhmm_to_minutes
 
 def create_time_slots():
     """Create standard time slots for any college"""
@@ -27,22 +29,19 @@ def create_time_slots():
         {'day': 0, 'period': 8, 'start': '15:50', 'end': '16:40'},
     ]
     
-    # Replicate for all weekdays
-    all_slots = []
-    for day in range(6):  # Monday to Saturday
-        for slot_template in time_slots_data:
-            time_slot = TimeSlot(
-                day_of_week=day,
-                period_number=slot_template['period'],
-                start_time=slot_template['start'],
-                end_time=slot_template['end'],
-                is_break=False,
-                is_active=True
-            )
-            all_slots.append(time_slot)
+    # One row per period, converted once, then replicated for all weekdays
+    period_rows = [{
+        'period_number': slot_template['period'],
+        'start_time': hhmm_to_minutes(slot_template['start']),
+        'end_time': hhmm_to_minutes(slot_template['end']),
+        'is_break': False,
+        'is_active': True
+    } for slot_template in time_slots_data]
+    all_slots = [{**row, 'day_of_week': day} for day in range(6) for row in period_rows]  # Monday to Saturday
     
-    db.session.add_all(all_slots)
-    print(f"Created {len(all_slots)} time slots")
+    # Plain rows in one executemany, no per-object unit-of-work bookkeeping; slots already present are kept
+    created = insert_missing(TimeSlot, all_slots, 'day_of_week', 'period_number')
+    print(f"Created {created} of {len(all_slots)} time slots")
 
 def create_teachers():
     """Create generic teachers"""
@@ -73,18 +72,15 @@ def create_teachers():
         {'name': 'Prof. Andrew Hall', 'code': 'AH', 'designation': 'Assistant Professor', 'load': 16},
     ]
     
-    teachers = []
-    for teacher_data in teachers_data:
-        teacher = Teacher(
-            name=teacher_data['name'],
-            code=teacher_data['code'],
-            designation=teacher_data['designation'],
-            max_weekly_load=teacher_data['load']
-        )
-        teachers.append(teacher)
+    teachers = [{
+        'name': teacher_data['name'],
+        'code': teacher_data['code'],
+        'designation': teacher_data['designation'],
+        'max_weekly_load': teacher_data['load']
+    } for teacher_data in teachers_data]
     
-    db.session.add_all(teachers)
-    print(f"Created {len(teachers)} teachers")
+    created = insert_missing(Teacher, teachers, 'code')
+    print(f"Created {created} of {len(teachers)} teachers")
 
 def create_courses():
     """Create generic courses"""
@@ -116,23 +112,20 @@ def create_courses():
         {'code': 'ENG301', 'name': 'Advanced Engineering', 'credits': 4, 'sessions': 4, 'is_lab': False, 'program': 'ENG', 'semester': 'V'},
     ]
     
-    courses = []
-    for course_data in courses_data:
-        course = Course(
-            code=course_data['code'],
-            name=course_data['name'],
-            credit_hours=course_data['credits'],
-            sessions_per_week=course_data['sessions'],
-            session_duration=1,
-            is_lab=course_data['is_lab'],
-            is_online=False,
-            program=course_data['program'],
-            semester=course_data['semester']
-        )
-        courses.append(course)
+    courses = [{
+        'code': course_data['code'],
+        'name': course_data['name'],
+        'credit_hours': course_data['credits'],
+        'sessions_per_week': course_data['sessions'],
+        'session_duration': 1,
+        'is_lab': course_data['is_lab'],
+        'is_online': False,
+        'program': course_data['program'],
+        'semester': course_data['semester']
+    } for course_data in courses_data]
     
-    db.session.add_all(courses)
-    print(f"Created {len(courses)} courses")
+    created = insert_missing(Course, courses, 'code')
+    print(f"Created {created} of {len(courses)} courses")
 
 def create_sections():
     """Create generic sections"""
@@ -162,19 +155,16 @@ def create_sections():
         {'name': 'ENG-V-B', 'program': 'ENG', 'semester': 'V', 'section_letter': 'B', 'students': 25},
     ]
     
-    sections = []
-    for section_data in sections_data:
-        section = Section(
-            name=section_data['name'],
-            program=section_data['program'],
-            semester=section_data['semester'],
-            section_letter=section_data['section_letter'],
-            student_count=section_data['students']
-        )
-        sections.append(section)
+    sections = [{
+        'name': section_data['name'],
+        'program': section_data['program'],
+        'semester': section_data['semester'],
+        'section_letter': section_data['section_letter'],
+        'student_count': section_data['students']
+    } for section_data in sections_data]
     
-    db.session.add_all(sections)
-    print(f"Created {len(sections)} sections")
+    created = insert_missing(Section, sections, 'program', 'semester', 'section_letter')
+    print(f"Created {created} of {len(sections)} sections")
 
 def create_rooms():
     """Create generic rooms"""
@@ -203,18 +193,15 @@ def create_rooms():
         {'number': 'AUD', 'name': 'Main Auditorium', 'type': 'auditorium', 'capacity': 200},
     ]
     
-    rooms = []
-    for room_data in rooms_data:
-        room = Room(
-            number=room_data['number'],
-            name=room_data['name'],
-            room_type=room_data['type'],
-            capacity=room_data['capacity']
-        )
-        rooms.append(room)
+    rooms = [{
+        'number': room_data['number'],
+        'name': room_data['name'],
+        'room_type': room_data['type'],
+        'capacity': room_data['capacity']
+    } for room_data in rooms_data]
     
-    db.session.add_all(rooms)
-    print(f"Created {len(rooms)} rooms")
+    created = insert_missing(Room, rooms, 'number')
+    print(f"Created {created} of {len(rooms)} rooms")
 
 def create_offerings():
     """Create generic course offerings"""
@@ -278,42 +265,36 @@ def create_offerings():
         {'teacher_name': 'Dr. Rachel White', 'course_code': 'ENG301', 'section_name': 'ENG-V-B'},
     ]
     
+    # Name -> id lookups fetched once, instead of three SELECTs per offering
+    teacher_ids = dict(db.session.execute(select(Teacher.name, Teacher.id)).all())
+    course_ids = dict(db.session.execute(select(Course.code, Course.id)).all())
+    section_ids = dict(db.session.execute(select(Section.name, Section.id)).all())
+    
     offerings = []
     for offering_data in offerings_data:
-        teacher = Teacher.query.filter_by(name=offering_data['teacher_name']).first()
-        course = Course.query.filter_by(code=offering_data['course_code']).first()
-        section = Section.query.filter_by(name=offering_data['section_name']).first()
+        teacher_id = teacher_ids.get(offering_data['teacher_name'])
+        course_id = course_ids.get(offering_data['course_code'])
+        section_id = section_ids.get(offering_data['section_name'])
         
-        if teacher and course and section:
-            offering = Offering(
-                teacher_id=teacher.id,
-                course_id=course.id,
-                section_id=section.id
-            )
-            offerings.append(offering)
+        if teacher_id and course_id and section_id:
+            offerings.append({
+                'teacher_id': teacher_id,
+                'course_id': course_id,
+                'section_id': section_id
+            })
         else:
             print(f"Warning: Could not create offering for {offering_data}")
     
-    db.session.add_all(offerings)
-    print(f"Created {len(offerings)} offerings")
+    created = insert_missing(Offering, offerings, 'teacher_id', 'course_id', 'section_id') if offerings else 0
+    print(f"Created {created} of {len(offerings)} offerings")
 
 def main():
     """Run the generic seed script"""
     with app.app_context():
         print("Starting generic database seeding...")
         
-        # Clear existing data
-        print("Clearing existing data...")
-        TimetableSlot.query.delete()
-        Offering.query.delete()
-        Teacher.query.delete()
-        Course.query.delete()
-        Section.query.delete()
-        Room.query.delete()
-        TimeSlot.query.delete()
-        db.session.commit()
-        
-        # Create new data
+        # Only rows missing by their natural key are inserted, so reseeding is idempotent and
+        # leaves existing rows (and the timetable slots that reference them) untouched
         create_time_slots()
         create_teachers()
         create_courses()
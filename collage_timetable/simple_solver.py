@@ -4,24 +4,52 @@ Simplified timetable solver that's more flexible
 """
 
 import logging
+import random
+import time
+from collections import Counter, defaultdict
 from typing import Dict, List, Tuple, Optional
 from ortools.sat.python import cp_model
+from sqlalchemy import select
 from app import db
 from models import (
-    Teacher, Course, Section, Room, TimeSlot, Offering, TimetableSlot,
-    TeacherAvailability, RoomAvailability, TimetableGeneration, UserConstraint
+    Section, Room, TimeSlot, TimetableSlot, TimetableView,
+    TeacherAvailability, RoomAvailability, TimetableGeneration, UserConstraint,
+    SectionCourseDemand, SectionDaySpan, OfferingLite, GenerationStatus, ConstraintType
 )
-from datetime import datetime
 
 logger = logging.getLogger(__name__)
 
 class SimpleTimetableSolver:
     """Simplified OR-Tools CP-SAT based timetable solver"""
     
-    def __init__(self):
+    def __init__(self, num_workers: int = 8, time_limit_seconds: float = 60.0, fast_mode: bool = True,
+                 lns_iterations: int = 10, reuse_unchanged: bool = True, lns_seed: int = 0):
         self.model = cp_model.CpModel()
         self.solver = cp_model.CpSolver()
-        self.variables = {}
+        # Several portfolio/LNS workers search in parallel; the model is pure feasibility (no objective),
+        # so the first assignment any worker finds is the answer
+        self.solver.parameters.num_workers = num_workers
+        self.time_limit_seconds = time_limit_seconds
+        self.solver.parameters.max_time_in_seconds = time_limit_seconds
+        self.solver.parameters.stop_after_first_solution = True
+        # Search progress follows this module's logger: on at DEBUG, and written through logging, not stdout
+        self.solver.parameters.log_search_progress = logger.isEnabledFor(logging.DEBUG)
+        self.solver.parameters.log_to_stdout = False
+        self.solver.log_callback = logger.debug
+        if fast_mode:
+            # Feasibility-only model of booleans plus small room domains: the LP relaxation, probing and
+            # full integer encoding mostly cost time here, so switch them off (presolve stays on)
+            self.solver.parameters.linearization_level = 0
+            self.solver.parameters.cp_model_probing_level = 0
+            self.solver.parameters.boolean_encoding_level = 0
+            self.solver.parameters.cp_model_presolve = True
+        self.lns_iterations = lns_iterations
+        # Seeded so the same data frees the same days in the same order on every run
+        self.lns_random = random.Random(lns_seed)
+        self.reuse_unchanged = reuse_unchanged
+        self.used = {}
+        self.room = {}
+        self.eligible_room_ids = {}
         self.offerings = []
         self.time_slots = []
         self.rooms = []
@@ -32,9 +60,25 @@ class SimpleTimetableSolver:
         try:
             logger.info("Starting simplified timetable generation...")
             
-            # Clear existing timetable
-            TimetableSlot.query.delete()
-            db.session.commit()
+            # A resubmit on unchanged data keeps the live timetable rather than solving again
+            input_hash = TimetableGeneration.input_fingerprint()
+            live = TimetableGeneration.live_from(input_hash) if self.reuse_unchanged else None
+            if live is not None:
+                logger.info(f"Inputs unchanged since generation {live.id}; keeping it")
+                return {
+                    'status': 'success',
+                    'solver_status': live.solver_status,
+                    'total_slots': live.total_slots,
+                    'solve_time': 0.0,
+                    'reused_generation_id': live.id
+                }
+            
+            # Record the run up front; its slots are tagged with it and only go live if it succeeds,
+            # so the current timetable stays in place until then. Flushed for its id only: the whole run
+            # is one transaction, committed once at the end
+            generation = TimetableGeneration(status=GenerationStatus.PENDING, input_hash=input_hash)
+            db.session.add(generation)
+            db.session.flush()
             
             # Load data
             self._load_data()
@@ -45,28 +89,52 @@ class SimpleTimetableSolver:
             # Add constraints
             self._add_hard_constraints()
             
+            # Warm start from a greedy placement
+            self._greedy_seed()
+            
             # Solve
-            start_time = datetime.now()
+            start_time = time.perf_counter()
             status = self.solver.Solve(self.model)
-            solve_time = (datetime.now() - start_time).total_seconds()
+            # Status and statistics both describe this solve; LNS re-solves only add sessions to it
+            statistics = {
+                'branches': self.solver.NumBranches(),
+                'conflicts': self.solver.NumConflicts(),
+                'wall_time': self.solver.WallTime()
+            }
+            assignment = None
+            if status == cp_model.OPTIMAL or status == cp_model.FEASIBLE:
+                assignment = self._current_assignment()
+                if self.lns_iterations:
+                    # LNS only gets what is left of the run's time limit
+                    assignment = self._solve_lns(assignment, self.lns_iterations,
+                                                 deadline=start_time + self.time_limit_seconds)
+            solve_time = time.perf_counter() - start_time
             
-            result = self._process_solution(status, solve_time)
+            result = self._process_solution(status, solve_time, generation.id, assignment, statistics)
             
             # Save generation record
-            generation = TimetableGeneration(
-                status=result['status'],
-                solver_status=result['solver_status'],
-                total_slots=result.get('total_slots', 0),
-                solve_time_seconds=solve_time,
-                notes=result.get('notes', '')
-            )
-            db.session.add(generation)
+            generation.status = result['status']
+            generation.solver_status = result['solver_status']
+            generation.total_slots = result.get('total_slots', 0)
+            generation.solve_time_seconds = solve_time
+            generation.notes = result.get('notes', '')
+            if result['status'] == 'success':
+                SectionDaySpan.rebuild(generation.id)
+                result['campus_periods'] = SectionDaySpan.campus_periods(generation.id)
+                logger.info(f"Sections spend {result['campus_periods']} periods on campus per week")
+                TimetableGeneration.activate(generation.id)
+                TimetableGeneration.prune()
+                TimetableView.refresh()
             db.session.commit()
             
             return result
             
         except Exception as e:
             logger.error(f"Error in timetable generation: {str(e)}")
+            # Rolling back also drops the run's own record, so the failure is logged as a fresh one
+            db.session.rollback()
+            db.session.add(TimetableGeneration(status=GenerationStatus.FAILED, notes=str(e)))
+            db.session.commit()
             return {
                 'status': 'failed',
                 'error': str(e),
@@ -77,87 +145,100 @@ class SimpleTimetableSolver:
         """Load all necessary data from database"""
         # NOTE: The solver is simplified and has hardcoded limits for performance.
         # It only considers the first 20 offerings. This should be adjusted for real-world use.
-        self.offerings = Offering.query.join(Course).join(Teacher).join(Section).filter(
-            Course.is_active == True,
-            Teacher.is_active == True,
-            Section.is_active == True
-        ).limit(20).all()
+        # Lightweight projections rather than ORM entities: no identity map, no lazy-load state
+        self.offerings = OfferingLite.load_active(limit=20)
         
         self.time_slots = TimeSlot.query.filter(
             TimeSlot.is_active == True,
             TimeSlot.is_break == False
         ).order_by(TimeSlot.day_of_week, TimeSlot.period_number).all()
+        # Lookups between (day, period) and time slot, built once per generation
+        self.slot_ids_by_position = {(ts.day_of_week, ts.period_number): ts.id for ts in self.time_slots}
+        self.time_slots_by_id = {ts.id: ts for ts in self.time_slots}
         
-        self.rooms = Room.query.filter(Room.is_active == True).all()
-        self.sections = Section.query.filter(Section.is_active == True).all()
+        self.rooms = Room.query.active().all()
+        self.sections = Section.query.active().all()
+        self.forbidden = self._load_forbidden_placements()
         
         logger.info(f"Loaded {len(self.offerings)} offerings, {len(self.time_slots)} time slots, "
                    f"{len(self.rooms)} rooms, {len(self.sections)} sections")
     
     def _create_variables(self):
         """Create decision variables for the solver"""
-        # Variable: assignment[offering_id][time_slot_id][room_id] = 0/1
-        self.variables = {}
+        # Variables: used[offering_id][time_slot_id] = 0/1, and room[offering_id][time_slot_id] = the room it
+        # is held in; one pair per (offering, time slot) instead of a boolean for every room
+        self.used = {}
+        self.room = {}
         
-        for offering in self.offerings:
-            self.variables[offering.id] = {}
+        # Rooms that fit each (section, course) by type and capacity, computed up front
+        demands = SectionCourseDemand.rebuild()
+        active_room_ids = {room.id for room in self.rooms}
+        
+        for index, offering in enumerate(self.offerings, start=1):
+            self.used[offering.id] = {}
+            self.room[offering.id] = {}
+            # Only consider suitable rooms (labs for lab courses, big enough for the section)
+            eligible_room_ids = sorted(active_room_ids.intersection(
+                demands[(offering.section_id, offering.course_id)].eligible_room_ids))
+            self.eligible_room_ids[offering.id] = eligible_room_ids
+            if not eligible_room_ids:
+                continue
+            # An unused (offering, slot) takes a placeholder room unique to the offering, so one
+            # AllDifferent per time slot keeps real rooms distinct without constraining the unused ones
+            unassigned = -index
             for time_slot in self.time_slots:
-                self.variables[offering.id][time_slot.id] = {}
-                for room in self.rooms:
-                    # Only consider suitable rooms (labs for lab courses, etc.)
-                    if self._is_suitable_room(offering.course, room):
-                        var_name = f'assign_{offering.id}_{time_slot.id}_{room.id}'
-                        self.variables[offering.id][time_slot.id][room.id] = self.model.NewBoolVar(var_name)
+                # User constraints are applied here by never creating the placements they rule out
+                if ('teacher', offering.teacher_id, time_slot.id) in self.forbidden or \
+                        ('section', offering.section_id, time_slot.id) in self.forbidden:
+                    continue
+                room_ids = [room_id for room_id in eligible_room_ids
+                            if ('room', room_id, time_slot.id) not in self.forbidden]
+                if not room_ids:
+                    continue
+                domain = cp_model.Domain.FromValues([unassigned, *room_ids])
+                used = self.model.NewBoolVar(f'used_{offering.id}_{time_slot.id}')
+                room = self.model.NewIntVarFromDomain(domain, f'room_{offering.id}_{time_slot.id}')
+                self.model.Add(room == unassigned).OnlyEnforceIf(used.Not())
+                self.model.Add(room != unassigned).OnlyEnforceIf(used)
+                self.used[offering.id][time_slot.id] = used
+                self.room[offering.id][time_slot.id] = room
     
-    def _is_suitable_room(self, course, room) -> bool:
-        """Check if room is suitable for course"""
-        if course.is_lab and room.room_type != 'lab':
-            return False
-        if not course.is_lab and room.room_type == 'lab':
-            # Allow theory classes in labs if no other option
-            pass
-        return True
-    
-    def _add_user_constraints(self):
-        """Add user-defined constraints"""
-        user_constraints = UserConstraint.query.filter_by(is_active=True).all()
-        
-        for constraint in user_constraints:
-            if constraint.constraint_type == 'teacher_unavailable':
+    def _load_forbidden_placements(self) -> set:
+        """User constraints as ('teacher' | 'room' | 'section', id, time_slot_id) placements to leave out"""
+        # One projected fetch of just the constraint kinds that rule placements out, no ORM entities
+        constraints = db.session.execute(
+            select(UserConstraint.constraint_type, UserConstraint.teacher_id, UserConstraint.room_id,
+                   UserConstraint.section_id, UserConstraint.day_of_week, UserConstraint.period_number)
+            .where(UserConstraint.is_active == True,
+                   UserConstraint.constraint_type.in_([ConstraintType.TEACHER_UNAVAILABLE,
+                                                       ConstraintType.ROOM_UNAVAILABLE,
+                                                       ConstraintType.SECTION_PREFERENCE]))
+        )
+        forbidden = set()
+        for constraint in constraints:
+            time_slot_id = self._get_time_slot_id(constraint.day_of_week, constraint.period_number)
+            if time_slot_id is None:
+                continue
+            
+            if constraint.constraint_type == ConstraintType.TEACHER_UNAVAILABLE:
                 # Teacher unavailable at specific time
                 if constraint.teacher_id:
-                    for offering in self.offerings:
-                        if offering.teacher_id == constraint.teacher_id:
-                            time_slot_id = self._get_time_slot_id(constraint.day_of_week, constraint.period_number)
-                            if time_slot_id and time_slot_id in self.variables[offering.id]:
-                                for room_id in self.variables[offering.id][time_slot_id]:
-                                    self.model.Add(self.variables[offering.id][time_slot_id][room_id] == 0)
+                    forbidden.add(('teacher', constraint.teacher_id, time_slot_id))
             
-            elif constraint.constraint_type == 'room_unavailable':
+            elif constraint.constraint_type == ConstraintType.ROOM_UNAVAILABLE:
                 # Room unavailable at specific time
                 if constraint.room_id:
-                    time_slot_id = self._get_time_slot_id(constraint.day_of_week, constraint.period_number)
-                    for offering in self.offerings:
-                        if time_slot_id in self.variables[offering.id]:
-                            if constraint.room_id in self.variables[offering.id][time_slot_id]:
-                                self.model.Add(self.variables[offering.id][time_slot_id][constraint.room_id] == 0)
+                    forbidden.add(('room', constraint.room_id, time_slot_id))
             
-            elif constraint.constraint_type == 'section_preference':
+            elif constraint.constraint_type == ConstraintType.SECTION_PREFERENCE:
                 # Section preference (avoid specific time)
                 if constraint.section_id:
-                    time_slot_id = self._get_time_slot_id(constraint.day_of_week, constraint.period_number)
-                    for offering in self.offerings:
-                        if offering.section_id == constraint.section_id:
-                            if time_slot_id in self.variables[offering.id]:
-                                for room_id in self.variables[offering.id][time_slot_id]:
-                                    self.model.Add(self.variables[offering.id][time_slot_id][room_id] == 0)
+                    forbidden.add(('section', constraint.section_id, time_slot_id))
+        return forbidden
     
     def _get_time_slot_id(self, day_of_week: int, period_number: int) -> Optional[int]:
         """Get time slot ID from day and period"""
-        for time_slot in self.time_slots:
-            if time_slot.day_of_week == day_of_week and time_slot.period_number == period_number:
-                return time_slot.id
-        return None
+        return self.slot_ids_by_position.get((day_of_week, period_number))
     
     def _add_hard_constraints(self):
         """Add hard constraints that must be satisfied"""
@@ -165,119 +246,165 @@ class SimpleTimetableSolver:
         # Constraint 1: Each offering must be scheduled at least once (relaxed from exactly sessions_per_week)
         for offering in self.offerings:
             # NOTE: The number of sessions is limited to a maximum of 3 for simplicity.
-            sessions_needed = min(offering.course.sessions_per_week, 3)  # Limit to 3 sessions max
-            assignments = []
-            
-            for time_slot_id in self.variables[offering.id]:
-                for room_id in self.variables[offering.id][time_slot_id]:
-                    assignments.append(self.variables[offering.id][time_slot_id][room_id])
+            sessions_needed = min(offering.sessions_per_week, 3)  # Limit to 3 sessions max
+            assignments = list(self.used[offering.id].values())
             
-            if assignments:
+            if not assignments:
+                continue
+            if sessions_needed == 1:
+                self.model.AddExactlyOne(assignments)
+            else:
                 # At least 1 session, at most sessions_needed
-                self.model.Add(sum(assignments) >= 1)
-                self.model.Add(sum(assignments) <= sessions_needed)
+                self.model.AddLinearConstraint(cp_model.LinearExpr.Sum(assignments), 1, sessions_needed)
         
-        # Constraint 2: No teacher conflicts (teacher can't be in two places at once)
-        teacher_slots = {}
+        # Constraints 2-4 are grouped in a single pass over the variables:
+        # (teacher_id, time_slot_id) / (section_id, time_slot_id) -> used flags, time_slot_id -> room vars.
+        # There is one flag per (offering, slot), so a teacher or section with a single offering can only
+        # ever form one-element groups; those are never built
+        teacher_offerings = Counter(offering.teacher_id for offering in self.offerings)
+        section_offerings = Counter(offering.section_id for offering in self.offerings)
+        teacher_slots = defaultdict(list)
+        section_slots = defaultdict(list)
+        room_slots = defaultdict(list)
         for offering in self.offerings:
-            teacher_id = offering.teacher_id
-            if teacher_id not in teacher_slots:
-                teacher_slots[teacher_id] = {}
-            
-            for time_slot_id in self.variables[offering.id]:
-                if time_slot_id not in teacher_slots[teacher_id]:
-                    teacher_slots[teacher_id][time_slot_id] = []
-                
-                for room_id in self.variables[offering.id][time_slot_id]:
-                    teacher_slots[teacher_id][time_slot_id].append(
-                        self.variables[offering.id][time_slot_id][room_id]
-                    )
+            shares_teacher = teacher_offerings[offering.teacher_id] > 1
+            shares_section = section_offerings[offering.section_id] > 1
+            for time_slot_id, used in self.used[offering.id].items():
+                if shares_teacher:
+                    teacher_slots[(offering.teacher_id, time_slot_id)].append(used)
+                if shares_section:
+                    section_slots[(offering.section_id, time_slot_id)].append(used)
+                room_slots[time_slot_id].append(self.room[offering.id][time_slot_id])
         
-        for teacher_id, slots in teacher_slots.items():
-            for time_slot_id, assignments in slots.items():
-                if len(assignments) > 1:
-                    self.model.Add(sum(assignments) <= 1)
+        # Constraint 2: No teacher conflicts (teacher can't be in two places at once)
+        # Constraint 4: No section conflicts (section can't have two classes at once)
+        for assignments in (*teacher_slots.values(), *section_slots.values()):
+            if len(assignments) > 1:
+                self.model.AddAtMostOne(assignments)
         
         # Constraint 3: No room conflicts (room can't host two classes at once)
-        room_slots = {}
-        for offering in self.offerings:
-            for time_slot_id in self.variables[offering.id]:
-                for room_id in self.variables[offering.id][time_slot_id]:
-                    if room_id not in room_slots:
-                        room_slots[room_id] = {}
-                    if time_slot_id not in room_slots[room_id]:
-                        room_slots[room_id][time_slot_id] = []
-                    
-                    room_slots[room_id][time_slot_id].append(
-                        self.variables[offering.id][time_slot_id][room_id]
-                    )
-        
-        for room_id, slots in room_slots.items():
-            for time_slot_id, assignments in slots.items():
-                if len(assignments) > 1:
-                    self.model.Add(sum(assignments) <= 1)
+        for rooms in room_slots.values():
+            if len(rooms) > 1:
+                self.model.AddAllDifferent(rooms)
+    
+    def _greedy_seed(self):
+        """Hint a first-fit placement so the search starts from a (near-)feasible timetable"""
+        busy = set(self.forbidden)  # ('teacher' | 'room' | 'section', id, time_slot_id) not free for the seed
         
-        # Constraint 4: No section conflicts (section can't have two classes at once)
-        section_slots = {}
-        for offering in self.offerings:
-            section_id = offering.section_id
-            if section_id not in section_slots:
-                section_slots[section_id] = {}
+        # Offerings needing the most sessions go first, while the week is still open
+        for offering in sorted(self.offerings, key=lambda o: o.sessions_per_week, reverse=True):
+            sessions_needed = min(offering.sessions_per_week, 3)
+            placed = {}
+            for time_slot_id in self.used[offering.id]:
+                if len(placed) == sessions_needed:
+                    break
+                if ('teacher', offering.teacher_id, time_slot_id) in busy or \
+                        ('section', offering.section_id, time_slot_id) in busy:
+                    continue
+                room_id = next((room_id for room_id in self.eligible_room_ids[offering.id]
+                                if ('room', room_id, time_slot_id) not in busy), None)
+                if room_id is not None:
+                    placed[time_slot_id] = room_id
+                    busy.update({('teacher', offering.teacher_id, time_slot_id), ('room', room_id, time_slot_id),
+                                 ('section', offering.section_id, time_slot_id)})
             
-            for time_slot_id in self.variables[offering.id]:
-                if time_slot_id not in section_slots[section_id]:
-                    section_slots[section_id][time_slot_id] = []
-                
-                for room_id in self.variables[offering.id][time_slot_id]:
-                    section_slots[section_id][time_slot_id].append(
-                        self.variables[offering.id][time_slot_id][room_id]
-                    )
+            for time_slot_id, used in self.used[offering.id].items():
+                self.model.AddHint(used, time_slot_id in placed)
+                if time_slot_id in placed:
+                    self.model.AddHint(self.room[offering.id][time_slot_id], placed[time_slot_id])
+    
+    def _current_assignment(self) -> Dict[Tuple[int, int], int]:
+        """The solver's last solution as {(offering_id, time_slot_id): room_id}"""
+        # The whole solution vector is fetched once and indexed in Python, not one solver call per variable
+        solution = self.solver.response_proto.solution
+        return {
+            (offering_id, time_slot_id): solution[self.room[offering_id][time_slot_id].Index()]
+            for offering_id, used_by_slot in self.used.items()
+            for time_slot_id, used in used_by_slot.items()
+            if solution[used.Index()]
+        }
+    
+    def _solve_lns(self, initial_assignment: Dict[Tuple[int, int], int], iters: int,
+                   deadline: float) -> Dict[Tuple[int, int], int]:
+        """Destroy-and-repair over days: free one day, freeze the rest, and keep any re-solve that
+        schedules more sessions; the remaining iterations share the time left before deadline"""
+        best = initial_assignment
+        days = sorted({ts.day_of_week for ts in self.time_slots})
+        most_sessions = sum(min(offering.sessions_per_week, 3) for offering in self.offerings)
+        if len(best) >= most_sessions:
+            return best
         
-        for section_id, slots in section_slots.items():
-            for time_slot_id, assignments in slots.items():
-                if len(assignments) > 1:
-                    self.model.Add(sum(assignments) <= 1)
+        # Same model every iteration; only the objective, hints and assumptions change
+        self.model.Maximize(cp_model.LinearExpr.Sum(
+            [used for used_by_slot in self.used.values() for used in used_by_slot.values()]))
+        self.solver.parameters.stop_after_first_solution = False
         
-        # Constraint 5: User-defined constraints
-        self._add_user_constraints()
+        for iteration in range(iters):
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                logger.info(f"LNS stopped after {iteration} iterations at the time limit")
+                break
+            self.solver.parameters.max_time_in_seconds = remaining / (iters - iteration)
+            day = self.lns_random.choice(days)
+            self.model.ClearHints()
+            self.model.ClearAssumptions()
+            frozen = []
+            for offering_id, used_by_slot in self.used.items():
+                for time_slot_id, used in used_by_slot.items():
+                    room_id = best.get((offering_id, time_slot_id))
+                    self.model.AddHint(used, room_id is not None)
+                    if room_id is not None:
+                        self.model.AddHint(self.room[offering_id][time_slot_id], room_id)
+                    if self.time_slots_by_id[time_slot_id].day_of_week != day:
+                        frozen.append(used if room_id is not None else used.Not())
+            self.model.AddAssumptions(frozen)
+            
+            status = self.solver.Solve(self.model)
+            if status == cp_model.OPTIMAL or status == cp_model.FEASIBLE:
+                candidate = self._current_assignment()
+                if len(candidate) > len(best):
+                    logger.info(f"LNS on day {day}: {len(best)} -> {len(candidate)} sessions")
+                    best = candidate
+                    if len(best) >= most_sessions:
+                        break
+        
+        self.model.ClearAssumptions()
+        return best
     
-    def _process_solution(self, status, solve_time: float) -> Dict:
+    def _process_solution(self, status, solve_time: float, generation_id: int,
+                          assignment: Optional[Dict[Tuple[int, int], int]], statistics: Dict) -> Dict:
         """Process the solver solution and save to database"""
         if status == cp_model.OPTIMAL or status == cp_model.FEASIBLE:
             logger.info(f"Solution found! Status: {self.solver.StatusName(status)}")
             
-            # Extract solution
+            # Extract solution as plain rows for a single bulk INSERT
             scheduled_slots = []
-            total_scheduled = 0
             
-            for offering in self.offerings:
-                for time_slot_id in self.variables[offering.id]:
-                    for room_id in self.variables[offering.id][time_slot_id]:
-                        if self.solver.Value(self.variables[offering.id][time_slot_id][room_id]) == 1:
-                            # Create timetable slot
-                            timetable_slot = TimetableSlot(
-                                offering_id=offering.id,
-                                section_id=offering.section_id,
-                                room_id=room_id,
-                                time_slot_id=time_slot_id
-                            )
-                            scheduled_slots.append(timetable_slot)
-                            total_scheduled += 1
+            offerings_by_id = {offering.id: offering for offering in self.offerings}
+            for (offering_id, time_slot_id), room_id in assignment.items():
+                offering = offerings_by_id[offering_id]
+                time_slot = self.time_slots_by_id[time_slot_id]
+                scheduled_slots.append({
+                    'generation_id': generation_id,
+                    'offering_id': offering_id,
+                    'section_id': offering.section_id,
+                    'teacher_id': offering.teacher_id,
+                    'room_id': room_id,
+                    'time_slot_id': time_slot_id,
+                    'day_of_week': time_slot.day_of_week,
+                    'period_number': time_slot.period_number
+                })
             
-            # Save to database
-            db.session.add_all(scheduled_slots)
-            db.session.commit()
+            # Save to database; executemany through the Core table skips per-object unit-of-work bookkeeping
+            if scheduled_slots:
+                db.session.execute(TimetableSlot.__table__.insert(), scheduled_slots)
             
             return {
                 'status': 'success',
                 'solver_status': self.solver.StatusName(status),
-                'total_slots': total_scheduled,
+                'total_slots': len(scheduled_slots),
                 'solve_time': solve_time,
-                'statistics': {
-                    'branches': self.solver.NumBranches(),
-                    'conflicts': self.solver.NumConflicts(),
-                    'wall_time': self.solver.WallTime()
-                }
+                'statistics': statistics
             }
         else:
             logger.error(f"No solution found. Status: {self.solver.StatusName(status)}")
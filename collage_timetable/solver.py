@@ -1,21 +1,35 @@
 import logging
+import time
+from collections import defaultdict
 from typing import Dict, List, Tuple, Optional
 from ortools.sat.python import cp_model
+from sqlalchemy import select
 from app import db
-from models import (Teacher, Course, Section, Room, TimeSlot, Offering, 
-                   TimetableSlot, TeacherAvailability, RoomAvailability, 
-                   TimetableGeneration)
-from datetime import datetime
+from models import (Section, Room, TimeSlot,
+                   TimetableSlot, TimetableView, TimetableGeneration, SectionCourseDemand,
+                   SectionDaySpan, OfferingLite, GenerationStatus, slot_bit)
 
 logger = logging.getLogger(__name__)
 
 class TimetableSolver:
     """OR-Tools CP-SAT based timetable solver"""
     
-    def __init__(self):
+    def __init__(self, num_workers: int = 8, time_limit_seconds: float = 60.0, probing_level: int = 0):
         self.model = cp_model.CpModel()
         self.solver = cp_model.CpSolver()
-        self.variables = {}
+        # Several portfolio/LNS workers search in parallel, capped in wall-clock time
+        self.solver.parameters.num_workers = num_workers
+        self.solver.parameters.max_time_in_seconds = time_limit_seconds
+        # Presolve probing over ~40k literals takes seconds on this model and rarely fixes anything;
+        # skipping it roughly halves time to a first timetable. Symmetry detection stays at its default
+        self.solver.parameters.cp_model_probing_level = probing_level
+        # Search progress follows this module's logger: on at DEBUG, and written through logging, not stdout
+        self.solver.parameters.log_search_progress = logger.isEnabledFor(logging.DEBUG)
+        self.solver.parameters.log_to_stdout = False
+        self.solver.log_callback = logger.debug
+        self.flat_variables = []
+        self.vars_by_offering = {}
+        self.var_index = {}
         self.offerings = []
         self.time_slots = []
         self.rooms = []
@@ -26,9 +40,12 @@ class TimetableSolver:
         try:
             logger.info("Starting timetable generation...")
             
-            # Clear existing timetable
-            TimetableSlot.query.delete()
-            db.session.commit()
+            # Record the run up front; its slots are tagged with it and only go live if it succeeds,
+            # so the current timetable stays in place until then. Flushed for its id only: the whole run
+            # is one transaction, committed once at the end
+            generation = TimetableGeneration(status=GenerationStatus.PENDING)
+            db.session.add(generation)
+            db.session.flush()
             
             # Load data
             self._load_data()
@@ -40,28 +57,40 @@ class TimetableSolver:
             self._add_hard_constraints()
             self._add_soft_constraints()
             
-            # Solve
-            start_time = datetime.now()
+            # Warm start from the live timetable
+            self._hint_previous_generation()
+            
+            # Solve; without soft constraints there is nothing to optimise, so stop at the first feasible timetable
+            self.solver.parameters.stop_after_first_solution = not self.model.HasObjective()
+            start_time = time.perf_counter()
             status = self.solver.Solve(self.model)
-            solve_time = (datetime.now() - start_time).total_seconds()
+            solve_time = time.perf_counter() - start_time
             
-            result = self._process_solution(status, solve_time)
+            result = self._process_solution(status, solve_time, generation.id)
             
             # Save generation record
-            generation = TimetableGeneration(
-                status=result['status'],
-                solver_status=result['solver_status'],
-                total_slots=result.get('total_slots', 0),
-                solve_time_seconds=solve_time,
-                notes=result.get('notes', '')
-            )
-            db.session.add(generation)
+            generation.status = result['status']
+            generation.solver_status = result['solver_status']
+            generation.total_slots = result.get('total_slots', 0)
+            generation.solve_time_seconds = solve_time
+            generation.notes = result.get('notes', '')
+            if result['status'] == 'success':
+                SectionDaySpan.rebuild(generation.id)
+                result['campus_periods'] = SectionDaySpan.campus_periods(generation.id)
+                logger.info(f"Sections spend {result['campus_periods']} periods on campus per week")
+                TimetableGeneration.activate(generation.id)
+                TimetableGeneration.prune()
+                TimetableView.refresh()
             db.session.commit()
             
             return result
             
         except Exception as e:
             logger.error(f"Error in timetable generation: {str(e)}")
+            # Rolling back also drops the run's own record, so the failure is logged as a fresh one
+            db.session.rollback()
+            db.session.add(TimetableGeneration(status=GenerationStatus.FAILED, notes=str(e)))
+            db.session.commit()
             return {
                 'status': 'failed',
                 'error': str(e),
@@ -70,215 +99,206 @@ class TimetableSolver:
     
     def _load_data(self):
         """Load all necessary data from database"""
-        self.offerings = Offering.query.join(Course).join(Teacher).join(Section).filter(
-            Course.is_active == True,
-            Teacher.is_active == True,
-            Section.is_active == True
-        ).all()
+        # Lightweight projections rather than ORM entities: no identity map, no lazy-load state
+        self.offerings = OfferingLite.load_active()
         
         self.time_slots = TimeSlot.query.filter(
             TimeSlot.is_active == True,
             TimeSlot.is_break == False
         ).order_by(TimeSlot.day_of_week, TimeSlot.period_number).all()
+        # Lookups between (day, period) and time slot, built once per generation
+        self.slot_ids_by_position = {(ts.day_of_week, ts.period_number): ts.id for ts in self.time_slots}
+        self.time_slots_by_id = {ts.id: ts for ts in self.time_slots}
         
-        self.rooms = Room.query.filter(Room.is_active == True).all()
-        self.sections = Section.query.filter(Section.is_active == True).all()
+        self.rooms = Room.query.active().all()
+        self.sections = Section.query.active().all()
         
         logger.info(f"Loaded {len(self.offerings)} offerings, {len(self.time_slots)} time slots, "
                    f"{len(self.rooms)} rooms, {len(self.sections)} sections")
     
     def _create_variables(self):
         """Create decision variables for the solver"""
-        # Variable: assignment[offering_id][time_slot_id][room_id] = 0/1
-        self.variables = {}
+        # Variable: assignment(offering, time_slot, room) = 0/1, kept in one flat list of
+        # (offering, time_slot_id, room_id, var); side indices give an offering's entries and the entry
+        # for an exact (offering_id, time_slot_id, room_id), so every pass below is a list scan
+        self.flat_variables = []
+        self.vars_by_offering = defaultdict(list)
+        self.var_index = {}
+        
+        # Rooms that fit each (section, course) by type and capacity, computed up front
+        demands = SectionCourseDemand.rebuild()
+        # Availability comes from the precomputed masks, so each check is a bit test
+        slot_bits = {slot.id: slot_bit(slot.day_of_week, slot.period_number) for slot in self.time_slots}
+        room_masks = {room.id: room.availability_mask for room in self.rooms}
         
         for offering in self.offerings:
-            self.variables[offering.id] = {}
+            # Only consider suitable rooms (labs for lab courses, big enough for the section), resolved
+            # once per offering rather than re-tested for every time slot
+            eligible_room_ids = set(demands[(offering.section_id, offering.course_id)].eligible_room_ids)
+            suitable_room_ids = [room.id for room in self.rooms if room.id in eligible_room_ids]
             for time_slot in self.time_slots:
-                self.variables[offering.id][time_slot.id] = {}
-                for room in self.rooms:
-                    # Only consider suitable rooms (labs for lab courses, etc.)
-                    if self._is_suitable_room(offering.course, room):
-                        var_name = f'assign_{offering.id}_{time_slot.id}_{room.id}'
-                        self.variables[offering.id][time_slot.id][room.id] = self.model.NewBoolVar(var_name)
+                bit = slot_bits[time_slot.id]
+                # Constraint 5: Teacher and room availability. A placement outside either is never created,
+                # rather than created and then fixed to 0
+                if not offering.teacher_mask & bit:
+                    continue
+                for room_id in suitable_room_ids:
+                    if not room_masks[room_id] & bit:
+                        continue
+                    var_name = f'assign_{offering.id}_{time_slot.id}_{room_id}'
+                    var = self.model.NewBoolVar(var_name)
+                    index = len(self.flat_variables)
+                    self.flat_variables.append((offering, time_slot.id, room_id, var))
+                    self.vars_by_offering[offering.id].append(index)
+                    self.var_index[(offering.id, time_slot.id, room_id)] = index
+        
+        candidates = len(self.offerings) * len(self.time_slots) * len(self.rooms)
+        logger.info(f"Created {len(self.flat_variables)} of {candidates} (offering, slot, room) placements; "
+                    f"the rest fail room type, capacity or availability")
     
-    def _is_suitable_room(self, course: Course, room: Room) -> bool:
-        """Check if room is suitable for course"""
-        if course.is_lab and room.room_type != 'lab':
-            return False
-        if not course.is_lab and room.room_type == 'lab':
-            # Allow theory classes in labs if no other option
-            pass
-        return True
+    def _hint_previous_generation(self):
+        """Hint the live timetable's placements, so a regeneration starts from the last accepted answer"""
+        previous = set(db.session.execute(
+            select(TimetableSlot.offering_id, TimetableSlot.time_slot_id, TimetableSlot.room_id)
+            .where(TimetableSlot.generation_id == TimetableGeneration.active_id())
+        ).tuples())
+        if not previous:
+            return
+        # Every assignment gets a value so the hint is a complete point; placements that no longer exist
+        # (deleted offerings, rooms given up, newly unavailable slots) simply have no variable to hint
+        for offering, time_slot_id, room_id, var in self.flat_variables:
+            self.model.AddHint(var, (offering.id, time_slot_id, room_id) in previous)
+        logger.info(f"Hinted {len(previous)} placements from the live timetable")
     
     def _add_hard_constraints(self):
         """Add hard constraints that must be satisfied"""
         
         # Constraint 1: Each offering must be scheduled exactly sessions_per_week times
         for offering in self.offerings:
-            sessions_needed = offering.course.sessions_per_week
-            assignments = []
-            
-            for time_slot_id in self.variables[offering.id]:
-                for room_id in self.variables[offering.id][time_slot_id]:
-                    assignments.append(self.variables[offering.id][time_slot_id][room_id])
-            
-            if assignments:
-                self.model.Add(sum(assignments) == sessions_needed)
-        
-        # Constraint 2: No teacher conflicts (teacher can't be in two places at once)
-        teacher_slots = {}
-        for offering in self.offerings:
-            teacher_id = offering.teacher_id
-            if teacher_id not in teacher_slots:
-                teacher_slots[teacher_id] = {}
+            if offering.is_lab and offering.session_duration > 1:
+                continue  # Multi-slot labs count whole runs, in _add_lab_duration_constraints
+            sessions_needed = offering.sessions_per_week
+            assignments = [self.flat_variables[index][3] for index in self.vars_by_offering[offering.id]]
             
-            for time_slot_id in self.variables[offering.id]:
-                if time_slot_id not in teacher_slots[teacher_id]:
-                    teacher_slots[teacher_id][time_slot_id] = []
-                
-                for room_id in self.variables[offering.id][time_slot_id]:
-                    teacher_slots[teacher_id][time_slot_id].append(
-                        self.variables[offering.id][time_slot_id][room_id]
-                    )
+            if not assignments:
+                continue
+            if sessions_needed == 1:
+                self.model.AddExactlyOne(assignments)
+            else:
+                self.model.Add(cp_model.LinearExpr.Sum(assignments) == sessions_needed)
         
-        for teacher_id, slots in teacher_slots.items():
-            for time_slot_id, assignments in slots.items():
-                if len(assignments) > 1:
-                    self.model.Add(sum(assignments) <= 1)
+        # Constraints 2-4 are grouped in a single pass over the flat variable list:
+        # (teacher_id | room_id | section_id, time_slot_id) -> assignment vars
+        teacher_slots = defaultdict(list)
+        room_slots = defaultdict(list)
+        section_slots = defaultdict(list)
+        for offering, time_slot_id, room_id, var in self.flat_variables:
+            teacher_slots[(offering.teacher_id, time_slot_id)].append(var)
+            room_slots[(room_id, time_slot_id)].append(var)
+            section_slots[(offering.section_id, time_slot_id)].append(var)
         
+        # Constraint 2: No teacher conflicts (teacher can't be in two places at once)
         # Constraint 3: No room conflicts (room can't host two classes at once)
-        room_slots = {}
-        for offering in self.offerings:
-            for time_slot_id in self.variables[offering.id]:
-                for room_id in self.variables[offering.id][time_slot_id]:
-                    if room_id not in room_slots:
-                        room_slots[room_id] = {}
-                    if time_slot_id not in room_slots[room_id]:
-                        room_slots[room_id][time_slot_id] = []
-                    
-                    room_slots[room_id][time_slot_id].append(
-                        self.variables[offering.id][time_slot_id][room_id]
-                    )
-        
-        for room_id, slots in room_slots.items():
-            for time_slot_id, assignments in slots.items():
-                if len(assignments) > 1:
-                    self.model.Add(sum(assignments) <= 1)
-        
         # Constraint 4: No section conflicts (section can't have two classes at once)
-        section_slots = {}
-        for offering in self.offerings:
-            section_id = offering.section_id
-            if section_id not in section_slots:
-                section_slots[section_id] = {}
-            
-            for time_slot_id in self.variables[offering.id]:
-                if time_slot_id not in section_slots[section_id]:
-                    section_slots[section_id][time_slot_id] = []
-                
-                for room_id in self.variables[offering.id][time_slot_id]:
-                    section_slots[section_id][time_slot_id].append(
-                        self.variables[offering.id][time_slot_id][room_id]
-                    )
+        for assignments in (*teacher_slots.values(), *room_slots.values(), *section_slots.values()):
+            if len(assignments) > 1:
+                self.model.AddAtMostOne(assignments)
         
-        for section_id, slots in section_slots.items():
-            for time_slot_id, assignments in slots.items():
-                if len(assignments) > 1:
-                    self.model.Add(sum(assignments) <= 1)
-        
-        # Constraint 5: Teacher availability
-        self._add_availability_constraints()
+        # Constraint 5 (teacher and room availability) is applied in _create_variables
         
         # Constraint 6: Lab duration constraints (labs need consecutive slots)
         self._add_lab_duration_constraints()
-    
-    def _add_availability_constraints(self):
-        """Add teacher and room availability constraints"""
-        # Teacher availability
-        teacher_unavailable = {}
-        for availability in TeacherAvailability.query.filter_by(is_available=False).all():
-            teacher_id = availability.teacher_id
-            time_slot_id = availability.time_slot_id
-            if teacher_id not in teacher_unavailable:
-                teacher_unavailable[teacher_id] = set()
-            teacher_unavailable[teacher_id].add(time_slot_id)
         
-        for offering in self.offerings:
-            teacher_id = offering.teacher_id
-            if teacher_id in teacher_unavailable:
-                for time_slot_id in teacher_unavailable[teacher_id]:
-                    if time_slot_id in self.variables[offering.id]:
-                        for room_id in self.variables[offering.id][time_slot_id]:
-                            self.model.Add(self.variables[offering.id][time_slot_id][room_id] == 0)
-        
-        # Room availability
-        room_unavailable = {}
-        for availability in RoomAvailability.query.filter_by(is_available=False).all():
-            room_id = availability.room_id
-            time_slot_id = availability.time_slot_id
-            if room_id not in room_unavailable:
-                room_unavailable[room_id] = set()
-            room_unavailable[room_id].add(time_slot_id)
-        
-        for offering in self.offerings:
-            for time_slot_id in self.variables[offering.id]:
-                for room_id in self.variables[offering.id][time_slot_id]:
-                    if room_id in room_unavailable and time_slot_id in room_unavailable[room_id]:
-                        self.model.Add(self.variables[offering.id][time_slot_id][room_id] == 0)
+        # Not a timetable rule: prune search over swaps of interchangeable rooms
+        self._add_symmetry_breaking(room_slots)
     
     def _add_lab_duration_constraints(self):
         """Ensure lab courses get consecutive time slots"""
-        # Group time slots by day
-        days_slots = {}
+        # Time slots of each day in period order; a lab run is `duration` consecutive entries of one day
+        days_slots = defaultdict(list)
         for slot in self.time_slots:
-            day = slot.day_of_week
-            if day not in days_slots:
-                days_slots[day] = []
-            days_slots[day].append(slot)
+            days_slots[slot.day_of_week].append(slot)
+        for day_slots in days_slots.values():
+            day_slots.sort(key=lambda x: x.period_number)
         
-        # Sort slots by period number for each day
-        for day in days_slots:
-            days_slots[day].sort(key=lambda x: x.period_number)
-        
-        # Add consecutive constraints for lab courses
+        # Each possible run (offering, room, day, first period) is a start bool owning a fixed-length
+        # optional interval on that day's period axis; a slot's assignment is 1 exactly when a run covers it
+        room_day_intervals = defaultdict(list)
         for offering in self.offerings:
-            if offering.course.is_lab and offering.course.session_duration > 1:
-                duration = offering.course.session_duration
-                
-                for day, day_slots in days_slots.items():
-                    if len(day_slots) >= duration:
-                        # For each possible starting position
-                        for i in range(len(day_slots) - duration + 1):
-                            consecutive_slots = day_slots[i:i + duration]
-                            
-                            # If any slot in the sequence is assigned, all must be assigned
-                            for room_id in self.variables[offering.id].get(consecutive_slots[0].id, {}):
-                                sequence_vars = []
-                                for slot in consecutive_slots:
-                                    if slot.id in self.variables[offering.id] and room_id in self.variables[offering.id][slot.id]:
-                                        sequence_vars.append(self.variables[offering.id][slot.id][room_id])
-                                
-                                if len(sequence_vars) == duration:
-                                    # All slots must have the same assignment value
-                                    for j in range(1, len(sequence_vars)):
-                                        self.model.Add(sequence_vars[0] == sequence_vars[j])
+            if not (offering.is_lab and offering.session_duration > 1):
+                continue
+            duration = offering.session_duration
+            room_ids = list(dict.fromkeys(self.flat_variables[index][2]
+                                          for index in self.vars_by_offering[offering.id]))
+            runs = []
+            for day, day_slots in days_slots.items():
+                for room_id in room_ids:
+                    slot_vars = [self.var_index.get((offering.id, slot.id, room_id)) for slot in day_slots]
+                    covering = [[] for _ in day_slots]
+                    for position in range(len(day_slots) - duration + 1):
+                        # A run needs every one of its slots to be a possible placement
+                        if None in slot_vars[position:position + duration]:
+                            continue
+                        start = self.model.NewBoolVar(f'lab_{offering.id}_{room_id}_{day}_{position}')
+                        room_day_intervals[(room_id, day)].append(self.model.NewOptionalFixedSizeIntervalVar(
+                            position, duration, start, f'lab_run_{offering.id}_{room_id}_{day}_{position}'))
+                        for covered in covering[position:position + duration]:
+                            covered.append(start)
+                        runs.append(start)
+                    # Channel: one linear equality per slot replaces the old pairwise window equalities
+                    for index, starts in zip(slot_vars, covering):
+                        if index is not None:
+                            self.model.Add(self.flat_variables[index][3] == cp_model.LinearExpr.Sum(starts))
+            
+            # Constraint 1 for multi-slot labs: sessions_per_week whole runs
+            if runs:
+                self.model.Add(cp_model.LinearExpr.Sum(runs) == offering.sessions_per_week)
+        
+        # Redundant with the per-slot room clash, but hands CP-SAT its scheduling propagators for the runs
+        for intervals in room_day_intervals.values():
+            if len(intervals) > 1:
+                self.model.AddNoOverlap(intervals)
+    
+    def _add_symmetry_breaking(self, room_slots: Dict[Tuple[int, int], List]):
+        """Fill interchangeable rooms in id order, so equivalent room permutations are searched once"""
+        # Rooms open to exactly the same offerings with the same availability can swap classes in any
+        # single slot. Rooms serving a multi-slot lab are left out, since a lab keeps its room across its run
+        room_offerings = defaultdict(set)
+        for offering, time_slot_id, room_id, var in self.flat_variables:
+            room_offerings[room_id].add(offering.id)
+        chained = {offering.id for offering in self.offerings
+                   if offering.is_lab and offering.session_duration > 1}
+        
+        groups = defaultdict(list)
+        for room in sorted(self.rooms, key=lambda room: room.id):
+            offering_ids = frozenset(room_offerings[room.id])
+            if offering_ids and not offering_ids & chained:
+                groups[(offering_ids, room.availability_mask)].append(room.id)
+        
+        for room_ids in groups.values():
+            for time_slot in self.time_slots:
+                for room_id, next_room_id in zip(room_ids, room_ids[1:]):
+                    self.model.Add(cp_model.LinearExpr.Sum(room_slots[(room_id, time_slot.id)])
+                                   >= cp_model.LinearExpr.Sum(room_slots[(next_room_id, time_slot.id)]))
     
     def _add_soft_constraints(self):
         """Add soft constraints for optimization"""
-        soft_constraints = []
+        # Objective terms as parallel (variable, weight) lists, so penalties are plain coefficients on
+        # existing variables instead of one auxiliary IntVar each
+        obj_vars = []
+        obj_coeffs = []
         
         # Prefer even distribution of classes throughout the week
-        self._add_distribution_preferences(soft_constraints)
+        self._add_distribution_preferences(obj_vars, obj_coeffs)
         
         # Prefer certain time slots over others
-        self._add_time_preferences(soft_constraints)
+        self._add_time_preferences(obj_vars, obj_coeffs)
         
         # Add objective to maximize soft constraint satisfaction
-        if soft_constraints:
-            self.model.Maximize(sum(soft_constraints))
+        if obj_vars:
+            self.model.Maximize(cp_model.LinearExpr.WeightedSum(obj_vars, obj_coeffs))
     
-    def _add_distribution_preferences(self, soft_constraints: List):
+    def _add_distribution_preferences(self, obj_vars: List, obj_coeffs: List[int]):
         """Add preferences for even distribution of classes"""
         # Group time slots by day
         days = {}
@@ -288,83 +308,76 @@ class TimetableSolver:
                 days[day] = []
             days[day].append(slot.id)
         
+        # (section_id, day) -> assignment vars, in one pass
+        day_of_slot = {slot.id: slot.day_of_week for slot in self.time_slots}
+        section_day_vars = defaultdict(list)
+        for offering, time_slot_id, room_id, var in self.flat_variables:
+            section_day_vars[(offering.section_id, day_of_slot[time_slot_id])].append(var)
+        
         # For each section, prefer even distribution across days
         for section in self.sections:
-            section_offerings = [o for o in self.offerings if o.section_id == section.id]
-            
             daily_assignments = {}
-            for day, day_slot_ids in days.items():
-                daily_vars = []
-                for offering in section_offerings:
-                    for slot_id in day_slot_ids:
-                        if slot_id in self.variables[offering.id]:
-                            for room_id in self.variables[offering.id][slot_id]:
-                                daily_vars.append(self.variables[offering.id][slot_id][room_id])
-                
+            for day in days:
+                daily_vars = section_day_vars.get((section.id, day))
                 if daily_vars:
                     daily_assignments[day] = self.model.NewIntVar(0, len(daily_vars), f'daily_{section.id}_{day}')
-                    self.model.Add(daily_assignments[day] == sum(daily_vars))
+                    self.model.Add(daily_assignments[day] == cp_model.LinearExpr.Sum(daily_vars))
             
-            # Add preference for balanced daily distribution
+            # Add preference for balanced daily distribution: penalise the spread between the busiest and
+            # quietest day, one max and one min per section rather than an |a - b| for every pair of days
             if len(daily_assignments) > 1:
-                days_list = list(daily_assignments.keys())
-                for i in range(len(days_list) - 1):
-                    for j in range(i + 1, len(days_list)):
-                        # Penalize large differences between days
-                        diff_var = self.model.NewIntVar(-20, 20, f'diff_{section.id}_{days_list[i]}_{days_list[j]}')
-                        self.model.Add(diff_var == daily_assignments[days_list[i]] - daily_assignments[days_list[j]])
-                        
-                        abs_diff = self.model.NewIntVar(0, 20, f'abs_diff_{section.id}_{days_list[i]}_{days_list[j]}')
-                        self.model.AddAbsEquality(abs_diff, diff_var)
-                        
-                        # Preference for smaller differences (weight: -1 for each unit of difference)
-                        balance_var = self.model.NewIntVar(-20, 0, f'balance_{section.id}_{days_list[i]}_{days_list[j]}')
-                        self.model.Add(balance_var == -abs_diff)
-                        soft_constraints.append(balance_var)
+                daily = list(daily_assignments.values())
+                most = max(len(section_day_vars[(section.id, day)]) for day in daily_assignments)
+                busiest = self.model.NewIntVar(0, most, f'daily_max_{section.id}')
+                quietest = self.model.NewIntVar(0, most, f'daily_min_{section.id}')
+                self.model.AddMaxEquality(busiest, daily)
+                self.model.AddMinEquality(quietest, daily)
+                
+                # Preference for a smaller spread (weight: -1 for each unit of busiest - quietest)
+                obj_vars.extend((busiest, quietest))
+                obj_coeffs.extend((-1, 1))
     
-    def _add_time_preferences(self, soft_constraints: List):
+    def _add_time_preferences(self, obj_vars: List, obj_coeffs: List[int]):
         """Add preferences for certain time slots"""
         # Avoid first and last periods when possible (soft constraint)
-        for offering in self.offerings:
-            for time_slot in self.time_slots:
-                if time_slot.period_number in [1, 8]:  # First and last periods
-                    for room_id in self.variables[offering.id].get(time_slot.id, {}):
-                        # Small penalty for using first/last slots
-                        penalty_var = self.model.NewIntVar(-1, 0, f'penalty_{offering.id}_{time_slot.id}_{room_id}')
-                        self.model.Add(penalty_var == -self.variables[offering.id][time_slot.id][room_id])
-                        soft_constraints.append(penalty_var)
+        for offering, time_slot_id, room_id, var in self.flat_variables:
+            if self.time_slots_by_id[time_slot_id].period_number in [1, 8]:  # First and last periods
+                # Small penalty for using first/last slots
+                obj_vars.append(var)
+                obj_coeffs.append(-1)
     
-    def _process_solution(self, status, solve_time: float) -> Dict:
+    def _process_solution(self, status, solve_time: float, generation_id: int) -> Dict:
         """Process the solver solution and save to database"""
         if status == cp_model.OPTIMAL or status == cp_model.FEASIBLE:
             logger.info(f"Solution found! Status: {self.solver.StatusName(status)}")
             
-            # Extract solution
+            # Extract solution as plain rows for a single bulk INSERT
             scheduled_slots = []
-            total_scheduled = 0
             
-            for offering in self.offerings:
-                for time_slot_id in self.variables[offering.id]:
-                    for room_id in self.variables[offering.id][time_slot_id]:
-                        if self.solver.Value(self.variables[offering.id][time_slot_id][room_id]) == 1:
-                            # Create timetable slot
-                            timetable_slot = TimetableSlot(
-                                offering_id=offering.id,
-                                section_id=offering.section_id,
-                                room_id=room_id,
-                                time_slot_id=time_slot_id
-                            )
-                            scheduled_slots.append(timetable_slot)
-                            total_scheduled += 1
+            # The whole solution vector is fetched once and indexed in Python, not one solver call per variable
+            solution = self.solver.response_proto.solution
+            for offering, time_slot_id, room_id, var in self.flat_variables:
+                if solution[var.Index()]:
+                    time_slot = self.time_slots_by_id[time_slot_id]
+                    scheduled_slots.append({
+                        'generation_id': generation_id,
+                        'offering_id': offering.id,
+                        'section_id': offering.section_id,
+                        'teacher_id': offering.teacher_id,
+                        'room_id': room_id,
+                        'time_slot_id': time_slot_id,
+                        'day_of_week': time_slot.day_of_week,
+                        'period_number': time_slot.period_number
+                    })
             
-            # Save to database
-            db.session.add_all(scheduled_slots)
-            db.session.commit()
+            # Save to database; executemany through the Core table skips per-object unit-of-work bookkeeping
+            if scheduled_slots:
+                db.session.execute(TimetableSlot.__table__.insert(), scheduled_slots)
             
             return {
                 'status': 'success',
                 'solver_status': self.solver.StatusName(status),
-                'total_slots': total_scheduled,
+                'total_slots': len(scheduled_slots),
                 'solve_time': solve_time,
                 'statistics': {
                     'branches': self.solver.NumBranches(),
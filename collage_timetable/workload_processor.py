@@ -3,30 +3,128 @@
 Workload file processor for handling different file formats
 """
 
+import functools
 import os
+import re
 import pandas as pd
 import PyPDF2
+try:
+    import pymupdf as fitz  # PyMuPDF: native text extraction, much faster than PyPDF2
+except ImportError:
+    try:
+        import fitz  # Releases before 1.24.3 only ship the old module name
+    except ImportError:
+        fitz = None
+try:
+    import pypdfium2 as pdfium  # PDFium: native like MuPDF, under a permissive licence
+except ImportError:
+    pdfium = None
+try:
+    import pyarrow  # Multithreaded CSV parsing and Arrow-backed string columns
+except ImportError:
+    pyarrow = None
 import logging
+from concurrent.futures import Future, ThreadPoolExecutor
 from typing import Dict, List, Optional
+from sqlalchemy import insert, select, update
 from app import app, db
+from extensions import cache, insert_missing
 from models import Teacher, Course, Section, Room, Offering, WorkloadFile
 
 logger = logging.getLogger(__name__)
 
+# Parsing runs off the request thread, one file at a time per process; imports in other gunicorn workers
+# can still overlap, so _save_new leaves keys that appear meanwhile to ON CONFLICT
+_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='workload')
+
+# Text parsing runs these once per line of an uploaded file, so compile them once here
+_COURSE_PATTERNS = [re.compile(p) for p in (
+    r'([A-Z]{2,4}-\d{2}-\d{3})',      # CS-22-301, BUS-22-301
+    r'([A-Z]{2,4}\d{3})',             # CS301, BUS301
+    r'([A-Z]{2,4}-\d{3})',            # CS-301, BUS-301
+    r'([A-Z]{2,4}\s+\d{3})',          # CS 301, BUS 301
+)]
+# Matches wherever any of the above does, so a line without a code costs one scan instead of four
+_ANY_COURSE_RE = re.compile('|'.join(pattern.pattern for pattern in _COURSE_PATTERNS))
+# A teacher's title as a word of its own, so "Chapter" or "Dream" do not count; the rest of the token
+# goes with it ("AP(Stage-I)"), so the name starts after it. Marks teacher lines in PDF text too
+_TITLE_RE = re.compile(r'(?<!\w)(?:(?:assistant|associate)\s+professor|professor|prof\.?|dr\.?|ap)(?!\w)\S*',
+                       re.IGNORECASE)
+# Line classifier for PDF text: a plain substring match, like the `in` check it replaces
+_COURSE_LINE_RE = re.compile(r'BCOM|BCA|MCA|MBA', re.IGNORECASE)
+# Spreadsheet header classifiers, one scan per column name; see _pick_columns for how they combine
+_TEACHER_COLUMN_RE = re.compile(r'teacher|faculty|instructor', re.IGNORECASE)
+_COURSE_COLUMN_RE = re.compile(r'course|subject', re.IGNORECASE)
+_CODE_COLUMN_RE = re.compile(r'code', re.IGNORECASE)
+_NAME_COLUMN_RE = re.compile(r'name|title', re.IGNORECASE)
+_COURSE_NAME_RE = re.compile(r'([A-Z]{3,4}-\d{2}-\d{3})')
+_NAME_CLEAN_RE = re.compile(r'[^\w\s-]')
+_SEMESTER_RE = re.compile(r'-(\d{2})-\d{3}')
+# Known program prefixes, longest first so a longer prefix wins over a shorter one
+_PROGRAM_PREFIXES = ('MATH', 'CHEM', 'ECON', 'HIST', 'BUS', 'ENG', 'PHY', 'BIO', 'PSY', 'LIT', 'ART', 'MUS', 'CS', 'PE')
+
+# Each reader returns one text string per page, in page order
+def _pdf_pages_pymupdf(path: str) -> List[str]:
+    with fitz.open(path) as doc:
+        return [page.get_text("text") for page in doc]
+
+def _pdf_pages_pypdfium2(path: str) -> List[str]:
+    pdf = pdfium.PdfDocument(path)
+    try:
+        pages = []
+        for page in pdf:
+            textpage = page.get_textpage()
+            pages.append(textpage.get_text_range())
+            textpage.close()
+            page.close()
+        return pages
+    finally:
+        pdf.close()
+
+def _pdf_pages_pypdf2(path: str) -> List[str]:
+    with open(path, 'rb') as file:
+        pdf_reader = PyPDF2.PdfReader(file)
+        return [page.extract_text() or "" for page in pdf_reader.pages]
+
+def _ocr_pdf_pages(path: str, page_numbers: List[int]) -> Dict[int, str]:
+    """OCR the given pages with Tesseract through PyMuPDF; slow, so only for pages with no text layer"""
+    with fitz.open(path) as doc:
+        texts = {}
+        for number in page_numbers:
+            page = doc[number]
+            texts[number] = page.get_text("text", textpage=page.get_textpage_ocr(dpi=150, full=True))
+        return texts
+
+# Native backends in the order 'auto' tries them; None when not installed. PyPDF2 is always the last resort
+_PDF_READERS = {
+    'pymupdf': _pdf_pages_pymupdf if fitz is not None else None,
+    'pypdfium2': _pdf_pages_pypdfium2 if pdfium is not None else None,
+}
+
 class WorkloadProcessor:
     """Process uploaded workload files"""
     
     def __init__(self, file_id: int):
         self.file_id = file_id
-        self.file = WorkloadFile.query.get(file_id)
-        self.file_path = self.file.file_path
-        self.file_type = self.file.original_filename.split('.')[-1].lower()
+        # Only the path and name are needed, so skip hydrating the whole row
+        self.file_path, original_filename = db.session.execute(
+            select(WorkloadFile.file_path, WorkloadFile.original_filename).where(WorkloadFile.id == file_id)
+        ).one()
+        self.file_type = original_filename.split('.')[-1].lower()
+        
+    def _set_status(self, status: str, notes: Optional[str] = None, **values):
+        """Record the file's processing status (and any other columns) with a single UPDATE; the caller commits"""
+        values['processing_status'] = status
+        if notes is not None:
+            values['processing_notes'] = notes
+        db.session.execute(update(WorkloadFile).where(WorkloadFile.id == self.file_id).values(**values)
+                           .execution_options(synchronize_session=False))
         
-    def process(self) -> Dict:
-        """Process the workload file"""
+    def process(self, save: bool = False) -> Dict:
+        """Process the workload file; the extracted rows are only counted unless save is set"""
         try:
             # Update status to processing
-            self.file.processing_status = 'processing'
+            self._set_status('processing')
             db.session.commit()
             
             # Process based on file type
@@ -39,57 +137,146 @@ class WorkloadProcessor:
             else:
                 raise ValueError(f"Unsupported file type: {self.file_type}")
             
-            # Update file status
-            self.file.processing_status = 'completed'
-            self.file.processing_notes = result.get('notes', 'Processing completed successfully')
+            notes = result.get('notes', 'Processing completed successfully')
+            saved = False
+            if result.get('success'):
+                # Parsing is heuristic, so nothing reaches the live tables until the user confirms the import
+                teachers, courses = self._new_records(result['data'])
+                if save:
+                    added = self._save_new(teachers, courses)
+                    notes += f"; added {added['teachers']} teachers and {added['courses']} courses"
+                    saved = True
+                else:
+                    notes += (f"; found {len(teachers)} new teachers{_preview(t['name'] for t in teachers)} and "
+                              f"{len(courses)} new courses{_preview(c['code'] for c in courses)}, not imported yet")
+            
+            # Update file status; the same commit lands the imported rows
+            self._set_status('completed', notes, processed=saved)
             db.session.commit()
+            if saved:
+                cache.clear()  # New teachers/courses change the cached dashboard and filter dropdowns
             
             return result
             
         except Exception as e:
             logger.error(f"Error processing file {self.file_id}: {str(e)}")
-            self.file.processing_status = 'failed'
-            self.file.processing_notes = f"Processing failed: {str(e)}"
+            # Drop any half-imported rows before recording the failure
+            db.session.rollback()
+            self._set_status('failed', f"Processing failed: {str(e)}")
             db.session.commit()
             return {'success': False, 'error': str(e)}
     
+    def _new_records(self, data: Dict):
+        """The extracted teachers and courses not on record yet, each listed once"""
+        # Excel results are keyed by sheet; PDF/CSV results are a single block
+        blocks = [data] if 'teachers' in data else list(data.values())
+        
+        # Existing keys in one SELECT each instead of one lookup per extracted row
+        known_names = set(db.session.scalars(select(Teacher.name)))
+        taken_codes = set(db.session.scalars(select(Teacher.code).where(Teacher.code.is_not(None))))
+        known_courses = set(db.session.scalars(select(Course.code)))
+        
+        teachers, courses = [], []
+        for block in blocks:
+            for teacher in block.get('teachers', []):
+                if teacher['name'] in known_names:
+                    continue
+                known_names.add(teacher['name'])
+                # Generated initials collide easily; the code is optional, so drop it rather than the teacher
+                code = teacher['code'] if teacher['code'] not in taken_codes else None
+                taken_codes.add(code)
+                teachers.append({'name': teacher['name'], 'code': code, 'designation': teacher['designation']})
+            for course in block.get('courses', []):
+                if course['code'] in known_courses:
+                    continue
+                known_courses.add(course['code'])
+                courses.append(course)
+        return teachers, courses
+    
+    def _save_new(self, teachers: List[Dict], courses: List[Dict]) -> Dict[str, int]:
+        """Insert the new teachers and courses, one executemany per table"""
+        # An import in another worker may have added the same codes since _new_records looked
+        added_teachers = insert_missing(Teacher, teachers, 'code') if teachers else 0
+        if added_teachers < len(teachers):
+            # Those teachers lost their code, not their row: add them again without one, unless the
+            # other import brought the same person
+            names = [teacher['name'] for teacher in teachers if teacher['code'] is not None]
+            present = set(db.session.scalars(select(Teacher.name).where(Teacher.name.in_(names))))
+            retry = [dict(teacher, code=None) for teacher in teachers
+                     if teacher['code'] is not None and teacher['name'] not in present]
+            if retry:
+                db.session.execute(insert(Teacher.__table__), retry)
+                added_teachers += len(retry)
+        return {
+            'teachers': added_teachers,
+            'courses': insert_missing(Course, courses, 'code') if courses else 0,
+        }
+    
     def _process_pdf(self) -> Dict:
         """Process PDF files"""
         try:
-            with open(self.file_path, 'rb') as file:
-                pdf_reader = PyPDF2.PdfReader(file)
-                text_content = ""
-                
-                for page in pdf_reader.pages:
-                    text_content += page.extract_text()
-                
-                # Extract data from text content
-                extracted_data = self._extract_data_from_text(text_content)
-                
-                return {
-                    'success': True,
-                    'data': extracted_data,
-                    'notes': f'Processed {len(pdf_reader.pages)} pages from PDF'
-                }
-                
+            pages = self._read_pdf_pages()
+            notes = f'Processed {len(pages)} pages from PDF'
+            
+            # Scanned pages come back empty; OCR is opt-in because it costs far more than the text layer
+            blank = [number for number, text in enumerate(pages) if not text.strip()]
+            if blank and app.config['PDF_OCR'] and fitz is not None:
+                try:
+                    for number, text in _ocr_pdf_pages(self.file_path, blank).items():
+                        pages[number] = text
+                    notes += f'; read {len(blank)} scanned pages with OCR'
+                except Exception as e:
+                    logger.warning(f"OCR failed on {self.file_path}: {str(e)}")
+                    notes += f'; OCR failed, skipped {len(blank)} pages without text'
+            elif blank:
+                notes += f'; skipped {len(blank)} pages without text (scanned?)'
+            
+            # Extract data from text content; a newline per page keeps page boundaries from gluing two lines together
+            extracted_data = self._extract_data_from_text("\n".join(pages))
+            
+            return {
+                'success': True,
+                'data': extracted_data,
+                'notes': notes
+            }
+            
         except Exception as e:
             return {'success': False, 'error': f'PDF processing error: {str(e)}'}
     
+    def _read_pdf_pages(self) -> List[str]:
+        """Return the PDF's text page by page from the configured backend, falling back to PyPDF2"""
+        backend = app.config['PDF_BACKEND']
+        for name in (list(_PDF_READERS) if backend == 'auto' else [backend]):
+            if name == 'pypdf2':
+                break
+            reader = _PDF_READERS.get(name)
+            if reader is None:
+                if backend != 'auto':
+                    logger.warning(f"PDF backend {name} is not available, falling back to PyPDF2")
+                continue
+            try:
+                return reader(self.file_path)
+            except Exception as e:
+                # In auto mode the next native backend may still read it; PyPDF2 is the last resort
+                logger.warning(f"{name} could not read {self.file_path}: {str(e)}")
+                continue
+        
+        return _pdf_pages_pypdf2(self.file_path)
+    
     def _process_excel(self) -> Dict:
         """Process Excel files"""
         try:
-            # Read all sheets
-            excel_file = pd.ExcelFile(self.file_path)
+            # Read all sheets in one pass over the workbook
+            sheets = pd.read_excel(self.file_path, sheet_name=None)
             extracted_data = {}
             
-            for sheet_name in excel_file.sheet_names:
-                df = pd.read_excel(self.file_path, sheet_name=sheet_name)
+            for sheet_name, df in sheets.items():
                 extracted_data[sheet_name] = self._extract_data_from_dataframe(df)
             
             return {
                 'success': True,
                 'data': extracted_data,
-                'notes': f'Processed {len(excel_file.sheet_names)} sheets from Excel file'
+                'notes': f'Processed {len(sheets)} sheets from Excel file'
             }
             
         except Exception as e:
@@ -98,7 +285,7 @@ class WorkloadProcessor:
     def _process_csv(self) -> Dict:
         """Process CSV files"""
         try:
-            df = pd.read_csv(self.file_path)
+            df = self._read_csv()
             extracted_data = self._extract_data_from_dataframe(df)
             
             return {
@@ -110,6 +297,16 @@ class WorkloadProcessor:
         except Exception as e:
             return {'success': False, 'error': f'CSV processing error: {str(e)}'}
     
+    def _read_csv(self) -> pd.DataFrame:
+        """Read the CSV with the Arrow reader when pyarrow is installed, else pandas' own parser"""
+        if pyarrow is not None:
+            try:
+                return pd.read_csv(self.file_path, engine='pyarrow', dtype_backend='pyarrow')
+            except Exception as e:
+                # The Arrow reader is stricter, e.g. about ragged rows, so give the C parser a chance
+                logger.warning(f"pyarrow could not read {self.file_path}, falling back to the default CSV parser: {str(e)}")
+        return pd.read_csv(self.file_path)
+    
     def _extract_data_from_text(self, text: str) -> Dict:
         """Extract structured data from text content"""
         data = {
@@ -127,13 +324,13 @@ class WorkloadProcessor:
                 continue
             
             # Look for teacher patterns
-            if any(title in line.lower() for title in ['dr.', 'professor', 'assistant professor', 'ap']):
+            if _TITLE_RE.search(line):
                 teacher_data = self._extract_teacher_from_text(line)
                 if teacher_data:
                     data['teachers'].append(teacher_data)
             
             # Look for course patterns
-            if any(code in line.upper() for code in ['BCOM', 'BCA', 'MCA', 'MBA']):
+            if _COURSE_LINE_RE.search(line):
                 course_data = self._extract_course_from_text(line)
                 if course_data:
                     data['courses'].append(course_data)
@@ -149,30 +346,25 @@ class WorkloadProcessor:
             'offerings': []
         }
         
-        # Look for teacher columns
-        teacher_columns = [col for col in df.columns if any(keyword in col.lower() for keyword in ['teacher', 'faculty', 'instructor', 'name'])]
-        if teacher_columns:
-            for _, row in df.iterrows():
-                teacher_name = row[teacher_columns[0]]
-                if pd.notna(teacher_name) and str(teacher_name).strip():
-                    data['teachers'].append({
-                        'name': str(teacher_name).strip(),
-                        'code': self._generate_teacher_code(str(teacher_name)),
-                        'designation': 'AP (Stage-I)'
-                    })
+        teacher_column, code_column, name_columns = self._pick_columns(df.columns)
+        if teacher_column is not None:
+            teacher_names = self._clean_column(df[teacher_column]).dropna()
+            data['teachers'] = [{
+                'name': teacher_name,
+                'code': self._generate_teacher_code(teacher_name),
+                'designation': 'AP (Stage-I)'
+            } for teacher_name in teacher_names]
         
-        # Look for course columns
-        course_columns = [col for col in df.columns if any(keyword in col.lower() for keyword in ['course', 'subject', 'code'])]
-        if course_columns:
-            for _, row in df.iterrows():
-                course_code = row[course_columns[0]]
-                if pd.notna(course_code) and str(course_code).strip():
-                    data['courses'].append({
-                        'code': str(course_code).strip(),
-                        'name': self._extract_course_name(row),
-                        'program': self._extract_program_from_code(str(course_code)),
-                        'semester': self._extract_semester_from_code(str(course_code))
-                    })
+        if code_column is not None:
+            course_codes = self._clean_column(df[code_column])
+            has_code = course_codes.notna()
+            course_names = self._extract_course_names(df, name_columns)[has_code]
+            data['courses'] = [{
+                'code': course_code,
+                'name': course_name,
+                'program': self._extract_program_from_code(course_code),
+                'semester': self._extract_semester_from_code(course_code)
+            } for course_code, course_name in zip(course_codes[has_code], course_names)]
         
         return data
     
@@ -180,17 +372,13 @@ class WorkloadProcessor:
         """Extract teacher information from text line"""
         # Simple pattern matching for teacher names
         words = text.split()
-        if len(words) >= 2:
-            # Look for titles
-            titles = ['Dr.', 'Professor', 'Prof.', 'Assistant', 'AP']
-            name_start = 0
-            for i, word in enumerate(words):
-                if any(title in word for title in titles):
-                    name_start = i + 1
-                    break
+        match = _TITLE_RE.search(text)
+        if len(words) >= 2 and match:
+            # The name follows the first title word
+            name_words = text[match.end():].split(maxsplit=3)[:3]  # Take up to 3 words for name
             
-            if name_start < len(words):
-                name = ' '.join(words[name_start:name_start+3])  # Take up to 3 words for name
+            if name_words:
+                name = ' '.join(name_words)
                 return {
                     'name': name,
                     'code': self._generate_teacher_code(name),
@@ -202,18 +390,12 @@ class WorkloadProcessor:
     def _extract_course_from_text(self, text: str) -> Optional[Dict]:
         """Extract course information from text line"""
         # Look for course code patterns - more flexible
-        import re
+        if not _ANY_COURSE_RE.search(text):
+            return None
         
-        # Multiple course code patterns
-        course_patterns = [
-            r'([A-Z]{2,4}-\d{2}-\d{3})',      # CS-22-301, BUS-22-301
-            r'([A-Z]{2,4}\d{3})',             # CS301, BUS301
-            r'([A-Z]{2,4}-\d{3})',            # CS-301, BUS-301
-            r'([A-Z]{2,4}\s+\d{3})',          # CS 301, BUS 301
-        ]
-        
-        for pattern in course_patterns:
-            match = re.search(pattern, text)
+        # The patterns are tried in priority order, not by position in the line
+        for pattern in _COURSE_PATTERNS:
+            match = pattern.search(text)
             if match:
                 code = match.group(1).replace(' ', '')  # Remove spaces
                 return {
@@ -225,56 +407,62 @@ class WorkloadProcessor:
         
         return None
     
-    def _extract_course_name(self, row: pd.Series) -> str:
-        """Extract course name from DataFrame row"""
-        name_columns = [col for col in row.index if any(keyword in col.lower() for keyword in ['name', 'title', 'subject'])]
-        if name_columns:
-            for col in name_columns:
-                if pd.notna(row[col]) and str(row[col]).strip():
-                    return str(row[col]).strip()
-        return "Unknown Course"
+    @staticmethod
+    def _clean_column(column: pd.Series) -> pd.Series:
+        """Strip a column's values as strings, leaving NaN where a cell is missing or blank"""
+        stripped = column.astype(str).str.strip()
+        return stripped.where(column.notna() & (stripped != ''))
+    
+    @staticmethod
+    def _pick_columns(columns):
+        """The teacher column, the course code column and the course name columns of a sheet"""
+        headers = [(col, str(col)) for col in columns]
+        # A plain "Name" column is the teacher's; "Course Name" or "Teacher Code" is not
+        uncoded = [(col, header) for col, header in headers if not _CODE_COLUMN_RE.search(header)]
+        teacher_column = next((col for col, header in uncoded if _TEACHER_COLUMN_RE.search(header)), None)
+        if teacher_column is None:
+            teacher_column = next((col for col, header in uncoded
+                                   if _NAME_COLUMN_RE.search(header) and not _COURSE_COLUMN_RE.search(header)), None)
+        # Prefer an explicit code column ("Course Code", not "Course Title"); a teacher's code is not a course's
+        candidates = [(col, header) for col, header in headers
+                      if col != teacher_column and not _TEACHER_COLUMN_RE.search(header)]
+        code_column = next((col for col, header in candidates if _CODE_COLUMN_RE.search(header)), None)
+        if code_column is None:
+            code_column = next((col for col, header in candidates
+                                if _COURSE_COLUMN_RE.search(header) and not _NAME_COLUMN_RE.search(header)), None)
+        name_columns = [col for col, header in candidates if col != code_column
+                        and (_NAME_COLUMN_RE.search(header) or _COURSE_COLUMN_RE.search(header))]
+        return teacher_column, code_column, name_columns
+    
+    def _extract_course_names(self, df: pd.DataFrame, name_columns: List) -> pd.Series:
+        """Extract each row's course name: the first non-blank of the course name columns"""
+        if not name_columns:
+            return pd.Series("Unknown Course", index=df.index)
+        names = df[name_columns].apply(self._clean_column)
+        return names.bfill(axis=1).iloc[:, 0].fillna("Unknown Course")
     
     def _extract_course_name_from_text(self, text: str) -> str:
         """Extract course name from text"""
         # Simple extraction - take text after course code
-        import re
-        course_pattern = r'([A-Z]{3,4}-\d{2}-\d{3})'
-        match = re.search(course_pattern, text)
+        match = _COURSE_NAME_RE.search(text)
         
         if match:
             code_end = match.end()
             name_part = text[code_end:].strip()
             # Clean up the name
-            name_part = re.sub(r'[^\w\s-]', '', name_part)
+            name_part = _NAME_CLEAN_RE.sub('', name_part)
             return name_part[:50] if name_part else "Unknown Course"
         
         return "Unknown Course"
     
-    def _extract_program_from_code(self, code: str) -> str:
+    # Pure string functions that see the same codes and names again and again across rows, sheets and pages
+    @staticmethod
+    @functools.lru_cache(maxsize=4096)
+    def _extract_program_from_code(code: str) -> str:
         """Extract program from course code"""
         # Generic program extraction - look for common patterns
-        import re
-        
-        # Common program patterns
-        program_patterns = {
-            r'^CS': 'CS',      # Computer Science
-            r'^BUS': 'BUS',    # Business
-            r'^ENG': 'ENG',    # Engineering
-            r'^MATH': 'MATH',  # Mathematics
-            r'^PHY': 'PHY',    # Physics
-            r'^CHEM': 'CHEM',  # Chemistry
-            r'^BIO': 'BIO',    # Biology
-            r'^ECON': 'ECON',  # Economics
-            r'^PSY': 'PSY',    # Psychology
-            r'^HIST': 'HIST',  # History
-            r'^LIT': 'LIT',    # Literature
-            r'^ART': 'ART',    # Arts
-            r'^MUS': 'MUS',    # Music
-            r'^PE': 'PE',      # Physical Education
-        }
-        
-        for pattern, program in program_patterns.items():
-            if re.match(pattern, code):
+        for program in _PROGRAM_PREFIXES:
+            if code.startswith(program):
                 return program
         
         # If no pattern matches, try to extract from the code
@@ -283,11 +471,11 @@ class WorkloadProcessor:
         
         return 'GEN'  # Generic
     
-    def _extract_semester_from_code(self, code: str) -> str:
+    @staticmethod
+    @functools.lru_cache(maxsize=4096)
+    def _extract_semester_from_code(code: str) -> str:
         """Extract semester from course code"""
-        import re
-        semester_pattern = r'-(\d{2})-\d{3}'
-        match = re.search(semester_pattern, code)
+        match = _SEMESTER_RE.search(code)
         
         if match:
             semester_num = int(match.group(1))
@@ -302,7 +490,9 @@ class WorkloadProcessor:
         
         return 'I'
     
-    def _generate_teacher_code(self, name: str) -> str:
+    @staticmethod
+    @functools.lru_cache(maxsize=4096)
+    def _generate_teacher_code(name: str) -> str:
         """Generate teacher code from name"""
         words = name.split()
         if len(words) >= 2:
@@ -312,8 +502,29 @@ class WorkloadProcessor:
         else:
             return "UN"
 
-def process_workload_file(file_id: int):
+def _preview(values, limit: int = 10) -> str:
+    """A short parenthesised list of what an import would add, for the file's notes"""
+    values = list(values)
+    if not values:
+        return ''
+    shown = ', '.join(values[:limit])
+    return f" ({shown}{', ...' if len(values) > limit else ''})"
+
+def process_workload_file(file_id: int, save: bool = False):
     """Process a workload file"""
     with app.app_context():
         processor = WorkloadProcessor(file_id)
-        return processor.process() 
\ No newline at end of file
+        return processor.process(save)
+
+def _process_in_background(file_id: int, save: bool):
+    """Executor entry point; nobody waits on the future, so log failures here"""
+    try:
+        return process_workload_file(file_id, save)
+    except Exception:
+        logger.exception(f"Background processing of workload file {file_id} crashed")
+        raise
+
+def enqueue_workload_file(file_id: int, save: bool = False) -> Future:
+    """Queue a workload file for processing (and, with save, importing) and return immediately; status is
+    tracked on the WorkloadFile row"""
+    return _executor.submit(_process_in_background, file_id, save)